@@ -0,0 +1,266 @@
+"""
+Throughput and memory benchmarks for the challenge primitives
+
+Each benchmark runs on synthetic input of every requested size and reports
+the best time out of a few runs, the throughput that works out to, and the
+peak memory allocated during one run. Results can be saved as a JSON baseline
+and later runs compared against it to flag regressions.
+
+Usage:
+
+    python benchmarks.py --sizes 1K,64K,1M --save baseline.json
+    python benchmarks.py --sizes 1K,64K,1M --compare baseline.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from typing import Callable, Dict, List
+
+from cryptopals import s1c3, s1c5, s1c6, s1c7, s1c8, s2c10
+
+
+SIZE_SUFFIXES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+DEFAULT_SIZES = '1K,16K,256K'
+
+# Sizes the slowest benchmarks are capped at, since they would otherwise
+# take minutes per run on the largest inputs
+SIZE_LIMITS = {
+    'likely_keysizes': 16 << 20,
+    'decrypt_by_repeating_key': 16 << 20,
+}
+
+SAMPLE_TEXT = (
+    b'Call me Ishmael. Some years ago- never mind how long precisely- '
+    b'having little or no money in my purse, and nothing particular to '
+    b'interest me on shore, I thought I would sail about a little and see '
+    b'the watery part of the world.\n'
+)
+
+KEY = b'Terminator X: Bring the noise'
+AES_KEY = b'YELLOW SUBMARINE'
+
+
+def parse_size(size: str) -> int:
+    size = size.strip().upper()
+    if size[-1] in SIZE_SUFFIXES:
+        return int(size[:-1]) * SIZE_SUFFIXES[size[-1]]
+    return int(size)
+
+
+def english(size: int) -> bytes:
+    return (SAMPLE_TEXT * (size // len(SAMPLE_TEXT) + 1))[:size]
+
+
+def random_bytes(size: int) -> bytes:
+    return random.Random(size).getrandbits(size * 8).to_bytes(size, 'big')
+
+
+def _single_character_xor(size: int) -> Callable:
+    body = english(size)
+    return lambda: s1c3.single_character_xor(body, 88)
+
+
+def _like_english_score(size: int) -> Callable:
+    body = english(size)
+    return lambda: s1c3.like_english_score(body)
+
+
+def _find_single_character_decryption_key(size: int) -> Callable:
+    body = s1c3.single_character_xor(english(size), 88)
+    return lambda: s1c3.find_single_character_decryption_key(body)
+
+
+def _hamming_distance(size: int) -> Callable:
+    b1 = random_bytes(size)
+    b2 = english(size)
+    return lambda: s1c6.hamming_distance(b1, b2)
+
+
+def _likely_keysizes(size: int) -> Callable:
+    body = s1c5.repeating_key_xor(english(size), KEY)
+    return lambda: s1c6.likely_keysizes(body, sample=None)
+
+
+def _decrypt_by_repeating_key(size: int) -> Callable:
+    body = s1c5.repeating_key_xor(english(size), KEY)
+    return lambda: s1c6.decrypt_by_repeating_key(body)
+
+
+def _same_blocks(size: int) -> Callable:
+    # Random blocks with every eighth block repeated
+    blocks = s1c6.BlockView(random_bytes(size), 16, 'truncate')
+    body = b''.join(
+        blocks[n - n % 8 if n % 8 == 7 else n] for n in range(len(blocks))
+    )
+    return lambda: s1c8.same_blocks(body)
+
+
+def _decrypt_aes_ecb(size: int) -> Callable:
+    body = random_bytes(size - size % 16)
+    return lambda: s1c7.decrypt_aes_ecb(AES_KEY, body)
+
+
+def _encrypt_aes_cbc(size: int) -> Callable:
+    body = random_bytes(size - size % 16)
+    return lambda: s2c10.encrypt_aes_cbc(AES_KEY, bytes(16), body)
+
+
+def _decrypt_aes_cbc(size: int) -> Callable:
+    body = random_bytes(size - size % 16)
+    return lambda: s2c10.decrypt_aes_cbc(AES_KEY, bytes(16), body)
+
+
+BENCHMARKS = {
+    'single_character_xor': _single_character_xor,
+    'like_english_score': _like_english_score,
+    'find_single_character_decryption_key':
+        _find_single_character_decryption_key,
+    'hamming_distance': _hamming_distance,
+    'likely_keysizes': _likely_keysizes,
+    'decrypt_by_repeating_key': _decrypt_by_repeating_key,
+    'same_blocks': _same_blocks,
+    'decrypt_aes_ecb': _decrypt_aes_ecb,
+    'encrypt_aes_cbc': _encrypt_aes_cbc,
+    'decrypt_aes_cbc': _decrypt_aes_cbc,
+}  # type: Dict[str, Callable[[int], Callable]]
+
+
+def measure(run: Callable, size: int, repeats: int) -> Dict[str, float]:
+    """
+    Time run repeats times and measure the peak memory of one more run
+
+    Returns a dict of best seconds, bytes per second, peak bytes allocated
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    # Tracing allocations slows everything down, so it gets its own run
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    seconds = min(timings)
+    return {
+        'seconds': seconds,
+        'throughput': size / seconds if seconds else float('inf'),
+        'peak_bytes': peak,
+    }
+
+
+def run_benchmarks(
+    sizes: List[int],
+    names: List[str],
+    repeats: int = 3
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Run every named benchmark at every size
+
+    Returns a dict of results by benchmark name then size
+    """
+    results = {}  # type: Dict[str, Dict[str, Dict[str, float]]]
+    for name in names:
+        results[name] = {}
+        for size in sizes:
+            if size > SIZE_LIMITS.get(name, size):
+                continue
+            result = measure(BENCHMARKS[name](size), size, repeats)
+            results[name][str(size)] = result
+            print(
+                '{:<40} {:>11} B {:>10.4f} s {:>10.2f} MB/s {:>11} B peak'
+                .format(
+                    name, size, result['seconds'],
+                    result['throughput'] / (1 << 20), result['peak_bytes'],
+                )
+            )
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    tolerance: float
+) -> List[str]:
+    """
+    Compare results against a baseline from an earlier run
+
+    Returns a description of every benchmark and size that got more than
+    tolerance (as a fraction) slower or used that much more peak memory
+    """
+    regressions = []
+    for name, by_size in results.items():
+        for size, result in by_size.items():
+            before = baseline.get(name, {}).get(size)
+            if before is None:
+                continue
+            for metric in ('seconds', 'peak_bytes'):
+                if result[metric] > before[metric] * (1 + tolerance):
+                    regressions.append(
+                        '{} at {} B: {} went from {:.6g} to {:.6g}'.format(
+                            name, size, metric, before[metric], result[metric]
+                        )
+                    )
+    return regressions
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes', default=DEFAULT_SIZES,
+        help='comma separated input sizes, e.g. 1K,1M,100M'
+    )
+    parser.add_argument(
+        '--only', default=','.join(BENCHMARKS),
+        help='comma separated benchmark names'
+    )
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument(
+        '--compare', help='compare results with this JSON baseline'
+    )
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='fraction a result may get worse before it counts as a '
+             'regression'
+    )
+    args = parser.parse_args(argv)
+
+    names = args.only.split(',')
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error('Unknown benchmark {}'.format(name))
+
+    results = run_benchmarks(
+        [parse_size(size) for size in args.sizes.split(',')],
+        names,
+        args.repeats,
+    )
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION: ' + regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,8 @@
+"""
+Solutions to the Cryptopals crypto challenges
+https://cryptopals.com/
+
+Each challenge is its own module, named for its set and number, e.g.
+cryptopals.s1c3 for set 1 challenge 3. Nothing is imported here, so that
+importing one module doesn't pay for the others.
+"""
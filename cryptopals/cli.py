@@ -0,0 +1,103 @@
+"""
+Command line entry point for the set 1 tools
+
+Each command imports the modules it needs when it runs, so that starting the
+program (and running the cheap commands) stays fast.
+"""
+
+import argparse
+import sys
+
+from typing import List, Optional
+
+
+def detect_xor(args: argparse.Namespace):
+    from . import s1c4
+
+    report = s1c4.detect_single_character_xor_in_file(
+        args.file, top_k=args.top, workers=args.workers
+    )
+    for offset, decrypted, key, score in report.results:
+        print('{}\t{}\t{:.6f}\t{!r}'.format(
+            offset, key.hex(), score, decrypted
+        ))
+    print(
+        '{} lines, {:.0f} lines/s'.format(
+            report.lines, report.lines_per_second
+        ),
+        file=sys.stderr
+    )
+
+
+def crack_xor(args: argparse.Namespace):
+    from . import s1c1
+    from . import s1c6
+
+    with open(args.file, 'rb') as file:
+        body = b''.join(s1c1.iter_base64_chunks(file))
+    decrypted, key = s1c6.decrypt_by_repeating_key(body, workers=args.workers)
+    print('key: {!r}'.format(key), file=sys.stderr)
+    sys.stdout.buffer.write(decrypted)
+
+
+def detect_ecb(args: argparse.Namespace):
+    from . import s1c8
+
+    for offset, _ in s1c8.scan_file_for_ecb(args.file, args.block_size):
+        print(offset)
+
+
+def decrypt_ecb(args: argparse.Namespace):
+    from . import s1c1
+    from . import s1c7
+
+    with open(args.file, 'rb') as file:
+        s1c7.decrypt_aes_ecb_stream(
+            args.key.encode(), s1c1.iter_base64_chunks(file), sys.stdout.buffer
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='cryptopals')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    command = commands.add_parser(
+        'detect-xor',
+        help='find the lines of a hex file most likely single-byte XORed'
+    )
+    command.add_argument('file')
+    command.add_argument('--top', type=int, default=1)
+    command.add_argument('--workers', type=int)
+    command.set_defaults(run=detect_xor)
+
+    command = commands.add_parser(
+        'crack-xor', help='decrypt a base64 file encrypted with repeating XOR'
+    )
+    command.add_argument('file')
+    command.add_argument('--workers', type=int, default=1)
+    command.set_defaults(run=crack_xor)
+
+    command = commands.add_parser(
+        'detect-ecb',
+        help='print the byte offsets of the lines of a hex file with repeated '
+             'blocks'
+    )
+    command.add_argument('file')
+    command.add_argument('--block-size', type=int, default=16)
+    command.set_defaults(run=detect_ecb)
+
+    command = commands.add_parser(
+        'decrypt-ecb', help='decrypt a base64 file encrypted with AES-ECB'
+    )
+    command.add_argument('key')
+    command.add_argument('file')
+    command.set_defaults(run=decrypt_ecb)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Opt-in timing and call counting for the stages of the cracking pipeline
+
+Instrumented functions only check a module flag when instrumentation is off,
+so leaving the decorators in place costs next to nothing. Turn it on for a
+block of code with collect():
+
+    with instrumentation.collect() as counters:
+        s1c6.decrypt_by_repeating_key(body)
+    print(counters['solve_columns']['seconds'])
+
+Only calls in the current process are counted, so pass workers=1 to the
+functions that can use a process pool when measuring them.
+"""
+
+import cProfile
+import functools
+import time
+from contextlib import contextmanager
+
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+
+
+ENABLED = False
+
+# Stage name to a dict of calls, seconds and bytes processed. Seconds include
+# time spent in any instrumented stages called from inside the stage.
+_counters = {}  # type: Dict[str, Dict[str, float]]
+
+_F = TypeVar('_F', bound=Callable)
+
+
+def record(name: str, seconds: float, processed: int = 0):
+    """
+    Add one call of a stage to the counters
+    """
+    counter = _counters.get(name)
+    if counter is None:
+        counter = _counters[name] = {'calls': 0, 'seconds': 0.0, 'bytes': 0}
+    counter['calls'] += 1
+    counter['seconds'] += seconds
+    counter['bytes'] += processed
+
+
+def instrumented(
+    name: str,
+    processed: Optional[Callable[..., int]] = None
+) -> Callable[[_F], _F]:
+    """
+    Decorate a function so that its calls are counted and timed under name
+    while instrumentation is enabled. processed is called with the same
+    arguments as the function to count the bytes it processed; by default
+    that's the length of the first argument.
+    """
+    def decorator(func: _F) -> _F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                if processed:
+                    size = processed(*args, **kwargs)
+                elif args and hasattr(args[0], '__len__'):
+                    size = len(args[0])
+                else:
+                    size = 0
+                record(name, seconds, size)
+        return wrapper  # type: ignore
+    return decorator
+
+
+def counters() -> Dict[str, Dict[str, float]]:
+    """
+    Return a copy of the counters collected so far
+    """
+    return {name: dict(counter) for name, counter in _counters.items()}
+
+
+def reset():
+    _counters.clear()
+
+
+@contextmanager
+def collect(
+    profile_to: Optional[str] = None
+) -> Iterator[Dict[str, Dict[str, float]]]:
+    """
+    Enable instrumentation for the duration of a with block, starting from
+    empty counters. The dict it yields belongs to this block alone and is
+    filled in when the block ends, so later collections and resets leave it
+    alone. A block nested inside another also counts towards the outer one.
+
+    If profile_to is a filename, the block is also run under cProfile and the
+    stats written there, for pstats, snakeviz, or flamegraph converters such
+    as flameprof.
+    """
+    global ENABLED
+
+    previous = ENABLED
+    # The stages counted so far by an enclosing block, if there is one
+    outer = counters()
+    reset()
+    collected = {}  # type: Dict[str, Dict[str, float]]
+    profiler = cProfile.Profile() if profile_to else None
+
+    ENABLED = True
+    if profiler:
+        profiler.enable()
+    try:
+        yield collected
+    finally:
+        if profiler and profile_to:
+            profiler.disable()
+            profiler.dump_stats(profile_to)
+        ENABLED = previous
+
+        collected.update(counters())
+        if previous:
+            # Add back what the enclosing block had counted before this one
+            for name, counter in outer.items():
+                total = _counters.setdefault(name, dict.fromkeys(counter, 0))
+                for field, value in counter.items():
+                    total[field] += value
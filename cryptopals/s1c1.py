@@ -0,0 +1,157 @@
+import base64
+import binascii
+import functools
+import mmap
+import os
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# Whitespace that line-wrapped base64 and hex files contain between records
+_WHITESPACE = b' \t\r\n\v\f'
+
+
+def hex_to_64(value: str) -> bytes:
+    return base64.b64encode(bytes.fromhex(value))
+
+
+def _chunks(
+    source: Union[BinaryIO, Iterable[bytes]],
+    chunk_size: int
+) -> Iterable[bytes]:
+    if hasattr(source, 'read'):
+        return iter(
+            functools.partial(source.read, chunk_size),  # type: ignore
+            b''
+        )
+    return source  # type: ignore
+
+
+def iter_hex_records(lines: Iterable[Union[str, bytes]]) -> Iterator[bytes]:
+    """
+    Decode an iterable of hex encoded lines (such as a file opened in either
+    text or binary mode) one record per line, skipping blank lines
+    """
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield binascii.unhexlify(line)
+
+
+def iter_base64_records(
+    lines: Iterable[Union[str, bytes]]
+) -> Iterator[bytes]:
+    """
+    Decode an iterable of base64 encoded lines one record per line, skipping
+    blank lines
+    """
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield binascii.a2b_base64(line)
+
+
+def iter_base64_chunks(
+    source: Union[BinaryIO, Iterable[bytes]],
+    chunk_size: int = 1 << 20
+) -> Iterator[bytes]:
+    """
+    Decode one base64 document, which may be wrapped across any number of
+    lines, from a binary file object or an iterable of chunks of bytes
+
+    The input is read chunk_size bytes at a time and decoded pieces are
+    yielded as soon as they are complete, so memory use doesn't depend on the
+    size of the file. Joined together, the pieces are the whole document.
+    """
+    # Encoded characters left over from the last chunk that don't make up a
+    # whole 4 character group yet
+    carry = b''
+    for chunk in _chunks(source, chunk_size):
+        encoded = carry + bytes(chunk).translate(None, _WHITESPACE)
+        complete = len(encoded) - len(encoded) % 4
+        carry = encoded[complete:]
+        if complete:
+            yield binascii.a2b_base64(encoded[:complete])
+
+    if carry:
+        raise ValueError('Incomplete base64 group at end of input')
+
+
+def shard_ranges(filename: str, shards: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into at most shards (start, end) byte ranges of roughly
+    equal size, each starting at the beginning of a line, so that separate
+    processes can each map and scan their own range of lines
+    """
+    with open(filename, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return []
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            boundaries = [0]
+            for n in range(1, shards):
+                # Move each boundary on to just past the next line break
+                newline = mapped.find(
+                    b'\n', max(size * n // shards, boundaries[-1])
+                )
+                if newline == -1 or newline + 1 >= size:
+                    break
+                boundaries.append(newline + 1)
+            boundaries.append(size)
+
+    return [
+        (start, end)
+        for start, end in zip(boundaries, boundaries[1:])
+        if start < end
+    ]
+
+
+def iter_mapped_hex_records(
+    filename: str,
+    start: int = 0,
+    end: Optional[int] = None
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Memory-map a file of hex encoded lines and decode the lines that start
+    between the start and end byte offsets, skipping blank lines. start must
+    be the beginning of a line, as it is in the ranges from shard_ranges.
+
+    Line breaks are found and lines decoded straight from the map, without
+    reading each line into its own string first.
+
+    Yields tuples of the line's byte offset in the file, decoded record
+    """
+    with open(filename, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return
+        end = size if end is None else min(end, size)
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                position = start
+                while position < end:
+                    newline = mapped.find(b'\n', position)
+                    if newline == -1:
+                        newline = size
+                    line_start = position
+                    while (
+                        line_start < newline and
+                        mapped[line_start] in _WHITESPACE
+                    ):
+                        line_start += 1
+                    line_end = newline
+                    while (
+                        line_end > line_start and
+                        mapped[line_end - 1] in _WHITESPACE
+                    ):
+                        line_end -= 1
+                    if line_end > line_start:
+                        yield position, binascii.unhexlify(
+                            view[line_start:line_end]
+                        )
+                    position = newline + 1
+            finally:
+                # The map can't be closed while a view of it is still open
+                view.release()
@@ -0,0 +1,92 @@
+import base64
+from typing import Optional, TypeVar, Union, overload
+
+
+# Anything bytes-like that the XOR functions take
+Buffer = Union[bytes, bytearray, memoryview]
+
+# A writable buffer to put the result in, which is also what's returned
+_Out = TypeVar('_Out', bytearray, memoryview)
+
+
+@overload
+def xor_bytes(b1: Buffer, b2: Buffer, out: None = None) -> bytes: ...
+
+
+@overload
+def xor_bytes(b1: Buffer, b2: Buffer, out: _Out) -> _Out: ...
+
+
+def xor_bytes(
+    b1: Buffer,
+    b2: Buffer,
+    out: Optional[Union[bytearray, memoryview]] = None
+) -> Buffer:
+    """
+    XOR two equal-length bytes-like objects. The XOR is done on the two as
+    big integers, so the work happens in C rather than byte by byte.
+
+    If out is given (a bytearray or writable memoryview of the same length,
+    which may be one of the inputs) the result is written into it and out is
+    returned.
+    """
+    if len(b1) != len(b2):
+        raise ValueError('Provided arguments must be the same length')
+    if out is not None and len(out) != len(b1):
+        raise ValueError('Output must be the same length as the arguments')
+
+    length = len(b1)
+    xored = (
+        int.from_bytes(b1, 'big') ^ int.from_bytes(b2, 'big')
+    ).to_bytes(length, 'big')
+
+    if out is None:
+        return xored
+    out[:] = xored
+    return out
+
+
+@overload
+def xor_repeating(
+    body: Buffer,
+    block: Buffer,
+    out: None = None,
+    phase: int = 0
+) -> bytes: ...
+
+
+@overload
+def xor_repeating(
+    body: Buffer,
+    block: Buffer,
+    out: _Out,
+    phase: int = 0
+) -> _Out: ...
+
+
+def xor_repeating(
+    body: Buffer,
+    block: Buffer,
+    out: Optional[Union[bytearray, memoryview]] = None,
+    phase: int = 0
+) -> Buffer:
+    """
+    XOR a block repeated across the whole length of body, such as a repeating
+    key or the same block against many blocks. phase is the position in block
+    of the first byte of body. out works as it does for xor_bytes.
+    """
+    if not block:
+        raise ValueError('Block must not be empty')
+
+    block = bytes(block)
+    phase %= len(block)
+    rotated = block[phase:] + block[:phase]
+    tiled = (rotated * (len(body) // len(block) + 1))[:len(body)]
+    return xor_bytes(body, tiled, out)
+
+
+def xor(b1: bytes, b2: bytes) -> bytes:
+    """
+    XOR two equal-length base64 encoded strings
+    """
+    return xor_bytes(base64.decodebytes(b1), base64.decodebytes(b2))
@@ -0,0 +1,484 @@
+import functools
+import hashlib
+import heapq
+import math
+import struct
+from array import array
+from collections import Counter, OrderedDict
+
+from typing import (
+    Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+)
+
+from .instrumentation import instrumented
+
+
+ENGLISH_CHARACTER_FREQUENCY = {
+    'a': 0.08167,
+    'b': 0.01492,
+    'c': 0.02782,
+    'd': 0.04253,
+    'e': 0.12702,
+    'f': 0.02228,
+    'g': 0.02015,
+    'h': 0.06094,
+    'i': 0.06966,
+    'j': 0.00153,
+    'k': 0.00772,
+    'l': 0.04025,
+    'm': 0.02406,
+    'n': 0.06749,
+    'o': 0.07507,
+    'p': 0.01929,
+    'q': 0.00095,
+    'r': 0.05987,
+    's': 0.06327,
+    't': 0.09056,
+    'u': 0.02758,
+    'v': 0.00978,
+    'w': 0.02360,
+    'x': 0.00150,
+    'y': 0.01974,
+    'z': 0.00074,
+}
+
+
+# Log-probability given to bytes a language model has never seen, so that a
+# single stray byte doesn't make a log-likelihood score infinite
+UNSEEN_LOG_PROBABILITY = math.log(1e-6)
+
+METRICS = ('l1', 'chi2', 'loglik')
+
+PRINTABLE = frozenset(range(0x20, 0x7f)) | frozenset(b'\t\n\r')
+
+_NON_PRINTABLE = tuple(x for x in range(256) if x not in PRINTABLE)
+
+# Key byte and score of a cached single character solution
+_SOLUTION = struct.Struct('<Bd')
+
+
+def single_character_xor(b: bytes, i: int) -> bytes:
+    xored = b.translate(bytes(x ^ i for x in range(256)))
+    return xored
+
+
+def byte_histogram(b: bytes) -> List[int]:
+    """
+    Count the occurrences of every byte value in a bytestring
+
+    Returns a list of 256 counts, indexed by byte value
+    """
+    histogram = [0] * 256
+    for value, count in Counter(b).items():
+        histogram[value] = count
+    return histogram
+
+
+class LanguageModel:
+    """
+    Byte-level character frequencies for a language, precomputed into 256
+    entry tables so that scoring a bytestring is one counting pass plus a
+    fixed amount of arithmetic
+
+    Bytes with a frequency of zero are outside the model's alphabet. The l1
+    and chi2 metrics only look at bytes inside the alphabet, loglik looks at
+    every byte. Lower scores are always more like the language.
+    """
+
+    def __init__(self, frequencies: Dict[int, float], metric: str = 'l1'):
+        if metric not in METRICS:
+            raise ValueError(
+                'Unknown metric {}, expected one of {}'.format(metric, METRICS)
+            )
+
+        self.metric = metric
+        self.probabilities = [0.0] * 256
+        for value, frequency in frequencies.items():
+            self.probabilities[value] = frequency
+        self.log_probabilities = [
+            math.log(p) if p > 0 else UNSEEN_LOG_PROBABILITY
+            for p in self.probabilities
+        ]
+        self.alphabet = tuple(
+            value for value in range(256) if self.probabilities[value] > 0
+        )
+
+    @classmethod
+    def from_frequencies(
+        cls,
+        frequencies: Dict[str, float],
+        metric: str = 'l1'
+    ) -> 'LanguageModel':
+        """
+        Build a model from a mapping of single characters to frequencies, such
+        as ENGLISH_CHARACTER_FREQUENCY
+        """
+        return cls(
+            {ord(character): f for character, f in frequencies.items()},
+            metric
+        )
+
+    @classmethod
+    def from_corpus(
+        cls,
+        filename: str,
+        metric: str = 'loglik'
+    ) -> 'LanguageModel':
+        """
+        Build a model from the byte frequencies of a sample text file. Unlike
+        ENGLISH_CHARACTER_FREQUENCY this includes spaces, punctuation and
+        capitals.
+        """
+        with open(filename, 'rb') as corpus:
+            histogram = byte_histogram(corpus.read())
+
+        total = sum(histogram)
+        if total == 0:
+            raise ValueError('Corpus {} is empty'.format(filename))
+
+        return cls(
+            {
+                value: count / total
+                for value, count in enumerate(histogram) if count
+            },
+            metric
+        )
+
+    def score(self, b: bytes) -> float:
+        """
+        Return a score that measures how the character distribution of a
+        string diverges from the character distribution of this language
+        """
+        return self.score_histogram(byte_histogram(b))
+
+    def score_histogram(self, histogram: Sequence[int], key: int = 0) -> float:
+        """
+        Score the byte histogram of a ciphertext as though every byte had been
+        XORed with key. XORing with a single byte only moves counts between
+        buckets, so every key can be scored from the same histogram without
+        decrypting anything
+        """
+
+        if self.metric == 'loglik':
+            total = 0
+            log_likelihood = 0.0
+            for value, count in enumerate(histogram):
+                if count:
+                    total += count
+                    log_likelihood += (
+                        count * self.log_probabilities[value ^ key]
+                    )
+            if total == 0:
+                return -UNSEEN_LOG_PROBABILITY
+            # Average negative log-likelihood per byte
+            return -log_likelihood / total
+
+        counts = [histogram[value ^ key] for value in self.alphabet]
+        total_chars = sum(counts)
+
+        # If there are no characters from the alphabet, it's probably not
+        # this language
+        if total_chars == 0:
+            return 2 if self.metric == 'l1' else math.inf
+
+        score = 0.0
+        if self.metric == 'l1':
+            for count, value in zip(counts, self.alphabet):
+                # Add the magnitude of divergence between the current
+                # character's frequency in the string and its frequency in
+                # the language
+                score += abs(self.probabilities[value] - (count / total_chars))
+        else:
+            for count, value in zip(counts, self.alphabet):
+                expected = self.probabilities[value] * total_chars
+                score += (count - expected) ** 2 / expected
+
+        return score
+
+
+ENGLISH = LanguageModel.from_frequencies(ENGLISH_CHARACTER_FREQUENCY)
+
+
+@instrumented('like_english_score')
+def like_english_score(b: bytes, model: LanguageModel = ENGLISH) -> float:
+    """
+    Return a score that measures how the character distribution of a string
+    diverges from the character distribution in English
+
+    Lower scores are more English-like
+    """
+    return model.score(b)
+
+
+def best_single_character_key(
+    b: bytes,
+    model: LanguageModel = ENGLISH
+) -> Tuple[int, float]:
+    """
+    Provided a bytestring, score every single-character key from its byte
+    histogram without decrypting anything
+
+    Returns a tuple of the lowest scoring key, its score. Ties go to the
+    lowest key.
+    """
+    histogram = byte_histogram(b)
+    scores = [model.score_histogram(histogram, key) for key in range(256)]
+    best = min(range(256), key=scores.__getitem__)
+    return best, scores[best]
+
+
+@instrumented('find_single_character_decryption_key')
+def find_single_character_decryption_key(
+    b: bytes,
+    model: LanguageModel = ENGLISH
+) -> Tuple[bytes, bytes, float]:
+    """
+    Provided a bytestring, attempt decryption with single-character keys,
+    assign them an english-likeness score, and return the lowest scoring string
+
+    Returns a tuple of string, encryption character, score
+    """
+    # Only the most english-like key needs to actually be decrypted
+    key, score = best_single_character_key(b, model)
+    return single_character_xor(b, key), bytes([key]), score
+
+
+def find_single_character_decryption_keys(
+    blocks: Iterable[bytes],
+    model: LanguageModel = ENGLISH
+) -> List[Tuple[bytes, bytes, float]]:
+    """
+    Provided a batch of bytestrings, find the most english-like single
+    character decryption of each one
+
+    Returns a list with one tuple of string, encryption character, score per
+    bytestring, in input order
+    """
+    return [
+        find_single_character_decryption_key(block, model) for block in blocks
+    ]
+
+
+class Candidates:
+    """
+    Single-character decryption candidates stored as parallel arrays of keys,
+    scores and offsets (such as line numbers), alongside references to the
+    ciphertexts they decrypt. Strings are only decrypted when a result is
+    asked for, which is usually just for the few best candidates.
+    """
+
+    __slots__ = ('sources', 'keys', 'scores', 'offsets')
+
+    def __init__(self):
+        self.sources = []  # type: List[bytes]
+        self.keys = array('B')
+        self.scores = array('d')
+        self.offsets = array('q')
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def append(self, source: bytes, key: int, score: float, offset: int = 0):
+        self.sources.append(source)
+        self.keys.append(key)
+        self.scores.append(score)
+        self.offsets.append(offset)
+
+    def top(self, k: int) -> List[int]:
+        """
+        Return the indexes of the k lowest scoring candidates, lowest first,
+        without sorting the rest. Ties go to the earlier candidate.
+        """
+        return heapq.nsmallest(
+            k, range(len(self)), key=self.scores.__getitem__
+        )
+
+    def plaintext(self, i: int) -> bytes:
+        return single_character_xor(self.sources[i], self.keys[i])
+
+    def result(self, i: int) -> Tuple[bytes, bytes, float]:
+        """
+        Return candidate i as a tuple of string, encryption character, score
+        """
+        return self.plaintext(i), bytes([self.keys[i]]), self.scores[i]
+
+
+def find_single_character_candidates(
+    blocks: Iterable[bytes],
+    model: LanguageModel = ENGLISH
+) -> Candidates:
+    """
+    Like find_single_character_decryption_keys, but returns the best key of
+    each bytestring as Candidates, offset by its position in blocks, without
+    decrypting any of them
+    """
+    candidates = Candidates()
+    for offset, block in enumerate(blocks):
+        key, score = best_single_character_key(block, model)
+        candidates.append(block, key, score, offset)
+    return candidates
+
+
+@functools.lru_cache(maxsize=256)
+def _non_printable_keys(value: int) -> Tuple[int, ...]:
+    """
+    The keys that XOR value into a non-printable character
+    """
+    return tuple(value ^ x for x in _NON_PRINTABLE)
+
+
+class PrunedSearch(NamedTuple):
+    # Tuples of string, encryption character, score, lowest score first
+    results: List[Tuple[bytes, bytes, float]]
+    # How many of the 256 keys were rejected without being fully scored
+    pruned: int
+
+
+def find_single_character_decryption_key_pruned(
+    b: bytes,
+    threshold: float = 0.05,
+    sample: int = 256,
+    top_k: int = 1,
+    model: LanguageModel = ENGLISH
+) -> PrunedSearch:
+    """
+    Like find_single_character_decryption_key, but first rejects every key
+    that decrypts more than threshold (as a fraction) of the first sample
+    bytes to non-printable characters, and only scores the remaining keys
+    against the whole string. If no key survives, all of them are scored.
+
+    Returns the top_k results and the number of keys pruned
+    """
+    prefix_length = min(len(b), sample)
+    allowed = threshold * prefix_length
+
+    non_printable = [0] * 256
+    for value, count in Counter(b[:sample]).items():
+        for key in _non_printable_keys(value):
+            non_printable[key] += count
+    survivors = [key for key in range(256) if non_printable[key] <= allowed]
+    if not survivors:
+        survivors = list(range(256))
+    pruned = 256 - len(survivors)
+
+    histogram = byte_histogram(b)
+    best = heapq.nsmallest(
+        top_k,
+        ((model.score_histogram(histogram, key), key) for key in survivors)
+    )
+    return PrunedSearch(
+        [
+            (single_character_xor(b, key), bytes([key]), score)
+            for score, key in best
+        ],
+        pruned,
+    )
+
+
+class SolutionCache:
+    """
+    A bounded cache of find_single_character_decryption_key results, keyed by
+    a digest of the ciphertext, so that identical columns (from repeated key
+    size trials or from re-cracking similar ciphertexts) are only solved once
+
+    Only the key and score of each solution are kept; the string is
+    decrypted again on a hit, which is a single bytes.translate. The least
+    recently used entries are evicted once the estimated size of the cache
+    passes max_bytes. If path is given, solutions are also written to a dbm
+    database there and read back on a miss, so that later runs can reuse
+    them. The database can't be shared by concurrent processes.
+    """
+
+    # Rough size in memory of one entry: the digest, the result tuple and its
+    # slot in the OrderedDict
+    ENTRY_BYTES = 200
+
+    def __init__(
+        self,
+        max_bytes: int = 16 << 20,
+        path: Optional[str] = None,
+        model: LanguageModel = ENGLISH
+    ):
+        self.max_bytes = max_bytes
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        # Digest to key byte, score, least recently used first
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._disk = None
+        if path:
+            import dbm
+            self._disk = dbm.open(path, 'c')
+
+        # Solutions from different models mustn't be mixed up, particularly
+        # on disk
+        self._salt = hashlib.blake2b(
+            repr((model.metric, model.probabilities)).encode(),
+            digest_size=16
+        ).digest()
+
+    def _digest(self, b: bytes) -> bytes:
+        return hashlib.blake2b(b, digest_size=16, salt=self._salt).digest()
+
+    def _remember(self, digest: bytes, solution: Tuple[int, float]):
+        self._entries[digest] = solution
+        self._entries.move_to_end(digest)
+        while len(self._entries) * self.ENTRY_BYTES > self.max_bytes:
+            self._entries.popitem(last=False)
+
+    def get(self, b: bytes) -> Optional[Tuple[bytes, bytes, float]]:
+        """
+        Return the cached solution for a bytestring, or None
+        """
+        digest = self._digest(b)
+        solution = self._entries.get(digest)
+        if solution is not None:
+            self._entries.move_to_end(digest)
+        elif self._disk is not None and digest in self._disk:
+            solution = _SOLUTION.unpack(self._disk[digest])
+            self._remember(digest, solution)
+
+        if solution is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        key, score = solution
+        return single_character_xor(b, key), bytes([key]), score
+
+    def put(self, b: bytes, result: Tuple[bytes, bytes, float]):
+        digest = self._digest(b)
+        _, key, score = result
+        solution = (key[0], score)
+        self._remember(digest, solution)
+        if self._disk is not None:
+            self._disk[digest] = _SOLUTION.pack(*solution)
+
+    def solve(self, b: bytes) -> Tuple[bytes, bytes, float]:
+        """
+        find_single_character_decryption_key, through the cache
+        """
+        result = self.get(b)
+        if result is None:
+            result = find_single_character_decryption_key(b, self.model)
+            self.put(b, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'bytes': len(self._entries) * self.ENTRY_BYTES,
+        }
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def __enter__(self) -> 'SolutionCache':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
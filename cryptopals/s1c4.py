@@ -0,0 +1,241 @@
+import binascii
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+
+from typing import (
+    Deque, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union, cast
+)
+
+from .s1c1 import iter_mapped_hex_records, shard_ranges
+from .s1c3 import (
+    Candidates,
+    best_single_character_key,
+    single_character_xor,
+)
+
+
+# (score, line number, ciphertext, encryption character), which sorts best
+# first. The string is only decrypted for the final results.
+_Candidate = Tuple[float, int, bytes, bytes]
+
+
+class DetectionReport(NamedTuple):
+    # Tuples of line number, string, encryption character, score, with the
+    # lowest scoring line first
+    results: List[Tuple[int, bytes, bytes, float]]
+    lines: int
+    seconds: float
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+# A hex encoded line (from a file opened in either text or binary mode), or
+# an already decoded record
+_Record = Union[str, bytes]
+
+
+def _numbered_records(
+    lines: Iterable[_Record],
+    decoded: bool
+) -> Iterator[Tuple[int, _Record]]:
+    for n, line in enumerate(lines):
+        if not decoded:
+            line = line.strip()
+            if not line:
+                continue
+        yield n, line
+
+
+def _best_in_chunk(
+    chunk: List[Tuple[int, _Record]],
+    top_k: int,
+    decoded: bool
+) -> List[_Candidate]:
+    """
+    Score every line in a chunk and keep only the top_k best scoring ones,
+    so that workers send back a handful of results rather than a whole chunk
+    """
+    candidates = Candidates()
+    for n, line in chunk:
+        record = cast(bytes, line) if decoded else binascii.unhexlify(line)
+        key, score = best_single_character_key(record)
+        candidates.append(record, key, score, n)
+    return [
+        (
+            candidates.scores[i],
+            candidates.offsets[i],
+            candidates.sources[i],
+            bytes([candidates.keys[i]]),
+        )
+        for i in candidates.top(top_k)
+    ]
+
+
+def _keep_best(
+    heap: List[_Candidate],
+    candidates: List[_Candidate],
+    top_k: int
+):
+    """
+    Merge candidates into a max-heap (scores and line numbers are negated) of
+    at most top_k entries. On equal scores earlier lines win.
+    """
+    for score, n, ciphertext, key in candidates:
+        entry = (-score, -n, ciphertext, key)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+
+def _report(
+    heap: List[_Candidate],
+    line_count: int,
+    start: float
+) -> DetectionReport:
+    results = [
+        (-n, single_character_xor(ciphertext, key[0]), key, -score)
+        for score, n, ciphertext, key in sorted(heap, reverse=True)
+    ]
+    return DetectionReport(
+        results,
+        line_count,
+        time.perf_counter() - start,
+    )
+
+
+def set_1_challenge_4(
+    filename: str,
+    workers: Optional[int] = None
+) -> Tuple[bytes, bytes, float]:
+    """
+    This function is written specifically to the challenge. Given a file name,
+    read all the rows from that file and identify one of those rows that is
+    encrypted with a single character
+
+    Returns a tuple of string, encryption character, score
+    """
+    report = detect_single_character_xor_in_file(filename, workers=workers)
+    _, decrypted, key, score = report.results[0]
+    return decrypted, key, score
+
+
+def detect_single_character_xor(
+    lines: Iterable[_Record],
+    top_k: int = 1,
+    workers: Optional[int] = None,
+    chunk_size: int = 1024,
+    decoded: bool = False,
+) -> DetectionReport:
+    """
+    Given an iterable of hex encoded lines (such as a file opened in either
+    text or binary mode), find the top_k lines that decrypt to the most
+    english-like strings with a single character key. With decoded=True the
+    iterable is of already decoded records instead, such as from
+    s1c1.iter_hex_records.
+
+    Lines are read lazily in chunks of chunk_size and fanned out to a pool of
+    worker processes (all cores by default, or in this process if workers is
+    1). Only a bounded number of chunks are in flight at a time and only the
+    top_k results are kept, so memory use doesn't grow with the input.
+    """
+    start = time.perf_counter()
+    numbered = _numbered_records(lines, decoded)
+    chunks = iter(lambda: list(itertools.islice(numbered, chunk_size)), [])
+
+    heap = []  # type: List[_Candidate]
+    line_count = 0
+
+    if workers == 1:
+        for chunk in chunks:
+            line_count += len(chunk)
+            _keep_best(heap, _best_in_chunk(chunk, top_k, decoded), top_k)
+    else:
+        # Imported here since multiprocessing is slow to import
+        from concurrent.futures import Future, ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            max_in_flight = 2 * (workers or os.cpu_count() or 1)
+            in_flight = deque()  # type: Deque[Future]
+            for chunk in chunks:
+                line_count += len(chunk)
+                in_flight.append(
+                    executor.submit(_best_in_chunk, chunk, top_k, decoded)
+                )
+                if len(in_flight) >= max_in_flight:
+                    _keep_best(heap, in_flight.popleft().result(), top_k)
+            while in_flight:
+                _keep_best(heap, in_flight.popleft().result(), top_k)
+
+    return _report(heap, line_count, start)
+
+
+def _best_in_shard(
+    filename: str,
+    start: int,
+    end: int,
+    top_k: int
+) -> Tuple[int, List[_Candidate]]:
+    """
+    Map a file and score the hex lines in one byte range of it, keeping only
+    the top_k best scoring ones
+
+    Returns a tuple of the number of lines read, candidates
+    """
+    heap = []  # type: List[_Candidate]
+    line_count = 0
+    for offset, record in iter_mapped_hex_records(filename, start, end):
+        line_count += 1
+        key, score = best_single_character_key(record)
+        _keep_best(heap, [(score, offset, record, bytes([key]))], top_k)
+    return line_count, [(-score, -n, d, k) for score, n, d, k in heap]
+
+
+def detect_single_character_xor_in_file(
+    filename: str,
+    top_k: int = 1,
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+) -> DetectionReport:
+    """
+    Like detect_single_character_xor, but for a file of hex encoded lines on
+    local disk. The file is split into shards byte ranges (by default four
+    per worker) which each worker memory-maps and scans on its own, so no
+    lines have to be read or sent to the workers by this process.
+
+    The results have byte offsets in the file in place of line numbers.
+    """
+    start = time.perf_counter()
+    pool_size = workers or os.cpu_count() or 1
+    ranges = shard_ranges(filename, shards or pool_size * 4)
+
+    heap = []  # type: List[_Candidate]
+    line_count = 0
+
+    if workers == 1:
+        shard_results = [
+            _best_in_shard(filename, shard_start, shard_end, top_k)
+            for shard_start, shard_end in ranges
+        ]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shard_results = list(executor.map(
+                _best_in_shard,
+                itertools.repeat(filename),
+                [shard_start for shard_start, _ in ranges],
+                [shard_end for _, shard_end in ranges],
+                itertools.repeat(top_k),
+            ))
+
+    for shard_line_count, candidates in shard_results:
+        line_count += shard_line_count
+        _keep_best(heap, candidates, top_k)
+
+    return _report(heap, line_count, start)
@@ -0,0 +1,40 @@
+from typing import BinaryIO
+
+from .s1c2 import xor_repeating
+
+
+def repeating_key_xor(value: bytes, key: bytes, phase: int = 0) -> bytes:
+    """
+    XOR value with key repeated across its whole length. phase is the
+    position in the key of the first byte of value, for continuing an
+    earlier call.
+    """
+    return xor_repeating(value, key, phase=phase)
+
+
+def repeating_key_xor_stream(
+    source: BinaryIO,
+    destination: BinaryIO,
+    key: bytes,
+    chunk_size: int = 1 << 20
+) -> int:
+    """
+    Read source chunk by chunk, XOR it with the repeating key and write the
+    result to destination, so that files of any size can be encrypted without
+    holding them in memory
+
+    Returns the number of bytes written
+    """
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    total = 0
+    while True:
+        read = source.readinto(view)  # type: ignore
+        if not read:
+            break
+        # XOR the chunk in place, carrying the key phase across chunk
+        # boundaries
+        xor_repeating(view[:read], key, out=view[:read], phase=total)
+        destination.write(view[:read])
+        total += read
+    return total
@@ -0,0 +1,470 @@
+import functools
+import os
+import sys
+from collections import Counter
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .instrumentation import instrumented
+from .s1c2 import Buffer
+from .s1c3 import (
+    ENGLISH,
+    LanguageModel,
+    SolutionCache,
+    find_single_character_decryption_key,
+    find_single_character_decryption_keys,
+    like_english_score,
+)
+
+
+if sys.version_info >= (3, 10):
+    def _popcount(x: int) -> int:
+        return x.bit_count()
+else:
+    def _popcount(x: int) -> int:
+        return bin(x).count('1')
+
+
+def hamming_distance(b1: bytes, b2: bytes) -> int:
+    if len(b1) != len(b2):
+        raise ValueError('Provided arguments must be the same length')
+
+    # XOR the two strings as big integers and count the differing bits
+    return _popcount(int.from_bytes(b1, 'big') ^ int.from_bytes(b2, 'big'))
+
+
+def hamming_distances(blocks: Sequence[Buffer]) -> List[List[int]]:
+    """
+    Given a list of equal-length blocks, return the matrix of hamming
+    distances between every pair of them, where the distance between
+    blocks[i] and blocks[j] is at [i][j]
+    """
+    if len({len(block) for block in blocks}) > 1:
+        raise ValueError('Provided blocks must be the same length')
+
+    # Convert every block to an integer once rather than once per pair
+    ints = [int.from_bytes(block, 'big') for block in blocks]
+    matrix = [[0] * len(ints) for _ in ints]
+    for i, x in enumerate(ints):
+        for j in range(i + 1, len(ints)):
+            matrix[i][j] = matrix[j][i] = _popcount(x ^ ints[j])
+    return matrix
+
+
+REMAINDER_POLICIES = ('pad', 'truncate', 'short')
+
+
+class BlockView:
+    """
+    A body of bytes seen as consecutive blocks of size, without copying it
+
+    remainder decides what happens to a final block shorter than size:
+    'pad' fills it out with zeros (which takes one copy of the body),
+    'truncate' drops it and 'short' keeps it as it is.
+    """
+
+    def __init__(self, body: Buffer, size: int, remainder: str = 'pad'):
+        if remainder not in REMAINDER_POLICIES:
+            raise ValueError(
+                'Unknown remainder policy {}, expected one of {}'.format(
+                    remainder, REMAINDER_POLICIES
+                )
+            )
+        if size < 1:
+            raise ValueError('Block size must be at least 1')
+
+        view = memoryview(body)
+        extra = len(view) % size
+        if extra and remainder == 'pad':
+            view = memoryview(bytes(view) + bytes(size - extra))
+        elif extra and remainder == 'truncate':
+            view = view[:len(view) - extra]
+
+        self.view = view
+        self.size = size
+
+    def __len__(self) -> int:
+        return -(-len(self.view) // self.size)
+
+    def __getitem__(self, index: int) -> memoryview:
+        if not -len(self) <= index < len(self):
+            raise IndexError('Block index out of range')
+        start = (index % len(self)) * self.size
+        return self.view[start:start + self.size]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        for start in range(0, len(self.view), self.size):
+            yield self.view[start:start + self.size]
+
+    def column(self, index: int) -> memoryview:
+        """
+        The index-th byte of every block, as a strided view
+        """
+        if not 0 <= index < self.size:
+            raise IndexError('Column index out of range')
+        return self.view[index::self.size]
+
+    def columns(self) -> List[memoryview]:
+        """
+        The blocks transposed, so that we get the first characters from each
+        block, the second characters from each block, the third characters
+        from each block, etc.
+        """
+        return [self.column(i) for i in range(self.size)]
+
+
+def bytes_to_blocks(n: int, body: bytes) -> List[Tuple[int, ...]]:
+    """
+    Break a bytes into a lists of byte integers of size n, filling out the
+    last one with zeros. BlockView does the same without the copies.
+    """
+    return [tuple(block) for block in BlockView(body, n)]
+
+
+KEYSIZE_METHODS = ('hamming', 'pairwise', 'coincidence')
+
+# Over the whole body, multiples of the key size score about as well as the
+# key size itself. Those scoring within this fraction of the best score are
+# moved behind the smaller sizes they are multiples of.
+MULTIPLE_TOLERANCE = 0.1
+
+
+def _hamming_keysize_score(
+    view: memoryview,
+    key_size: int,
+    sample: Optional[int],
+    whole: int = 0
+) -> Optional[float]:
+    """
+    Normalized hamming distance between neighbouring blocks of key_size bytes
+
+    With a sample, compare each even block with the odd block after it until
+    sample bytes have been covered. Without one, compare the whole body with
+    itself shifted by key_size, which compares every block with the next in
+    a single pass. whole must then be the entire body as an integer, so it is
+    only converted once for all key sizes.
+    """
+    if sample is None:
+        compared = len(view) - key_size
+        if compared <= 0:
+            return None
+        # The low bytes of whole are body[key_size:], and shifting it right
+        # by key_size bytes leaves body[:-key_size]
+        mask = (1 << (8 * compared)) - 1
+        xored = (whole ^ (whole >> (8 * key_size))) & mask
+        return _popcount(xored) / (compared * 2)
+
+    pair_count = min(sample // key_size, len(view) // key_size) // 2
+    if pair_count == 0:
+        return None
+
+    # The summed distance between each even block and the odd block after it
+    # is the distance between all the even blocks and all the odd blocks,
+    # which only takes one comparison
+    blocks = BlockView(view, key_size, 'truncate')
+    distance = hamming_distance(
+        b''.join(blocks[x * 2] for x in range(pair_count)),
+        b''.join(blocks[x * 2 + 1] for x in range(pair_count)),
+    )
+    return distance / (pair_count * key_size * 2)
+
+
+def _pairwise_keysize_score(
+    view: memoryview,
+    key_size: int
+) -> Optional[float]:
+    """
+    Average hamming distance per byte between every pair of blocks of
+    key_size bytes, rather than only neighbouring ones, which evens out the
+    noise of a small sample
+    """
+    blocks = list(BlockView(view, key_size, 'truncate'))
+    if len(blocks) < 2:
+        return None
+
+    distances = hamming_distances(blocks)
+    total = sum(
+        distances[i][j]
+        for i in range(len(blocks))
+        for j in range(i + 1, len(blocks))
+    )
+    pair_count = len(blocks) * (len(blocks) - 1) // 2
+    return total / (pair_count * key_size)
+
+
+def _coincidence_keysize_score(
+    view: memoryview,
+    key_size: int
+) -> Optional[float]:
+    """
+    Average index of coincidence of the columns of key_size. Each column of
+    the right key size is single-byte XORed plaintext, which keeps the uneven
+    distribution of the plaintext, whereas other sizes mix key bytes together
+    and look closer to uniform.
+    """
+    if len(view) < key_size * 2:
+        return None
+
+    total = 0.0
+    for column in BlockView(view, key_size, 'short').columns():
+        n = len(column)
+        coincidences = sum(c * (c - 1) for c in Counter(column).values())
+        total += coincidences / (n * (n - 1))
+    return total / key_size
+
+
+def _fold_multiples(
+    ranked: List[Tuple[int, float]],
+    descending: bool
+) -> List[Tuple[int, float]]:
+    """
+    Given key sizes sorted best first, move the ones that score close to the
+    best and are multiples of another size that also does behind the rest of
+    those close to the best
+    """
+    if not ranked:
+        return ranked
+
+    best = ranked[0][1]
+    if descending:
+        cutoff = best * (1 - MULTIPLE_TOLERANCE)
+        near = [entry for entry in ranked if entry[1] >= cutoff]
+    else:
+        cutoff = best * (1 + MULTIPLE_TOLERANCE)
+        near = [entry for entry in ranked if entry[1] <= cutoff]
+
+    sizes = [size for size, _ in near]
+    roots = []
+    multiples = []
+    for entry in near:
+        if any(entry[0] % size == 0 for size in sizes if size < entry[0]):
+            multiples.append(entry)
+        else:
+            roots.append(entry)
+    return roots + multiples + ranked[len(near):]
+
+
+@instrumented('likely_keysizes')
+def likely_keysizes(
+    body: bytes,
+    min_key_size=2,
+    max_key_size=40,
+    sample: Optional[int] = 160,
+    method: str = 'hamming',
+) -> List[Tuple[int, float]]:
+    """
+    Given a body of bytes, make a list of key sizes in order by
+    calculating the hamming distance between the first two strings of that key
+    size in the body
+
+    sample is the number of bytes of the body to look at for each key size, or
+    None to use all of it. method is either 'hamming' for the normalized
+    distance between neighbouring blocks, 'pairwise' for the average distance
+    between every pair of blocks in the sample (which needs a sample, since
+    the number of pairs grows with its square), or 'coincidence' for the index
+    of coincidence of each column, which needs a larger sample to be reliable.
+
+    Returns a list of two-tuples of the format
+    (key size, normalized edit distance) or (key size, index of coincidence),
+    sorted with the most likely key sizes at the top. When the whole body is
+    used, multiples of a key size that scores close to the best come after
+    it, even if they score a little better.
+
+    (See http://cryptopals.com/sets/1/challenges/6 step 3)
+    """
+    if method not in KEYSIZE_METHODS:
+        raise ValueError(
+            'Unknown method {}, expected one of {}'.format(
+                method, KEYSIZE_METHODS
+            )
+        )
+    if method == 'pairwise' and sample is None:
+        raise ValueError('The pairwise method needs a sample')
+
+    view = memoryview(body)
+    whole = int.from_bytes(view, 'big') if sample is None else 0
+
+    attempted_key_sizes = []
+    for key_size in range(min_key_size, max_key_size + 1):
+        if method == 'hamming':
+            score = _hamming_keysize_score(view, key_size, sample, whole)
+        elif method == 'pairwise':
+            score = _pairwise_keysize_score(view[:sample], key_size)
+        else:
+            score = _coincidence_keysize_score(
+                view if sample is None else view[:sample], key_size
+            )
+
+        # Skip key sizes too long to compare within the body
+        if score is None:
+            continue
+
+        # Store this key size alongsize its score
+        attempted_key_sizes.append((key_size, score))
+
+    # Sort all attempted key sizes in order of smallest hamming distance, or
+    # of largest index of coincidence
+    descending = method == 'coincidence'
+    attempted_key_sizes.sort(key=lambda x: x[1], reverse=descending)
+
+    if sample is None:
+        return _fold_multiples(attempted_key_sizes, descending)
+    return attempted_key_sizes
+
+
+def _transpose(size: int, body: bytes) -> List[bytes]:
+    """
+    Split a body into its size columns, filling out a short final block with
+    zeros
+    """
+    return [column.tobytes() for column in BlockView(body, size).columns()]
+
+
+def _untranspose(columns: Sequence[bytes]) -> bytes:
+    """
+    Interleave equal-length columns back into a single string of blocks
+    """
+    size = len(columns)
+    joined = bytearray(size * len(columns[0]))
+    for i, column in enumerate(columns):
+        joined[i::size] = column
+    return bytes(joined)
+
+
+def _solve_uncached(
+    columns: List[bytes],
+    workers: Optional[int],
+    model: LanguageModel
+) -> List[Tuple[bytes, bytes, float]]:
+    if workers == 1 or len(columns) < 2:
+        return find_single_character_decryption_keys(columns, model)
+
+    # Imported here since multiprocessing is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool_size = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=pool_size) as executor:
+        solve = functools.partial(
+            find_single_character_decryption_key, model=model
+        )
+        return list(executor.map(
+            solve,
+            columns,
+            chunksize=max(1, len(columns) // (pool_size * 4)),
+        ))
+
+
+@instrumented(
+    'solve_columns',
+    lambda columns, *args, **kwargs: sum(len(column) for column in columns)
+)
+def _solve_columns(
+    columns: List[bytes],
+    workers: Optional[int] = 1,
+    cache: Optional[SolutionCache] = None
+) -> List[Tuple[bytes, bytes, float]]:
+    """
+    Find the single character decryption of every column, in this process if
+    workers is 1 or spread across a pool of worker processes otherwise
+
+    With a cache, only columns that aren't already in it are solved, and
+    identical columns are only solved once.
+    """
+    if cache is None:
+        return _solve_uncached(columns, workers, ENGLISH)
+
+    results = [cache.get(column) for column in columns]
+
+    # Column to the positions it appears at
+    unsolved = {}  # type: Dict[bytes, List[int]]
+    for i, result in enumerate(results):
+        if result is None:
+            unsolved.setdefault(columns[i], []).append(i)
+
+    solved = _solve_uncached(list(unsolved), workers, cache.model)
+    for (column, positions), result in zip(unsolved.items(), solved):
+        cache.put(column, result)
+        for i in positions:
+            results[i] = result
+
+    return results  # type: ignore
+
+
+@instrumented('decrypt_by_repeating_key_with_size')
+def decrypt_by_repeating_key_with_size(
+    body: bytes,
+    size: int,
+    workers: Optional[int] = 1,
+    cache: Optional[SolutionCache] = None
+) -> Tuple[bytes, bytes]:
+    """
+    Given a bytes and a specific key size, attempt to deduce
+    the key used with repeating key encryption
+    """
+    solved = _solve_columns(_transpose(size, body), workers, cache)
+
+    decryption_key = b''.join(column_key for _, column_key, _ in solved)
+    decrypted_string = _untranspose([column for column, _, _ in solved])
+
+    return decrypted_string, decryption_key
+
+
+@instrumented('rank_repeating_key_decryptions')
+def rank_repeating_key_decryptions(
+    body: bytes,
+    candidates: int = 5,
+    workers: Optional[int] = 1,
+    cache: Optional[SolutionCache] = None
+) -> List[Tuple[bytes, bytes, float]]:
+    """
+    Given a bytes, decrypt it with the most likely key for each of the top
+    candidates key sizes
+
+    The columns of every candidate key size are solved as one batch, so that
+    with more than one worker (or workers=None for all cores) they are all
+    spread across the same pool of processes. A SolutionCache saves solving
+    columns that have been seen before.
+
+    Returns a list of tuples of string, key, score sorted with the most
+    english-like decryption at the top
+    """
+    key_sizes = [size for size, _ in likely_keysizes(body)[0:candidates]]
+    columns_by_size = [_transpose(size, body) for size in key_sizes]
+    solved = _solve_columns(
+        [column for columns in columns_by_size for column in columns],
+        workers,
+        cache
+    )
+
+    ranked = []
+    offset = 0
+    for size in key_sizes:
+        solved_columns = solved[offset:offset + size]
+        offset += size
+
+        decrypted = _untranspose([column for column, _, _ in solved_columns])
+        key = b''.join(column_key for _, column_key, _ in solved_columns)
+        ranked.append((decrypted, key, like_english_score(decrypted)))
+
+    # Sort by english-likeness
+    ranked.sort(key=lambda x: x[2])
+    return ranked
+
+
+def decrypt_by_repeating_key(
+    body: bytes,
+    workers: Optional[int] = 1,
+    cache: Optional[SolutionCache] = None
+):
+    """
+    Given a bytes, attempt to determine the repeating key
+    that it was encrypted with and decrypt it
+    """
+
+    # Take the top 5 key sizes and return the most english-like result
+    decrypted, key, _ = rank_repeating_key_decryptions(
+        body, 5, workers, cache
+    )[0]
+
+    # Returns: decrypted, key
+    return decrypted, key
@@ -0,0 +1,110 @@
+import functools
+from typing import BinaryIO, Iterable, List, Union
+
+
+BLOCK_SIZE = 16
+
+# How many distinct keys keep a ready-made cipher around
+CIPHER_CACHE_SIZE = 128
+
+
+@functools.lru_cache(maxsize=CIPHER_CACHE_SIZE)
+def ecb_cipher(key: bytes):
+    """
+    Return an AES-ECB cipher for key, reusing the one from an earlier call
+    with the same key so that its key schedule is only computed once. ECB
+    keeps no state between calls, so a cipher can safely be shared.
+
+    The least recently used ciphers are evicted once CIPHER_CACHE_SIZE keys
+    have been seen. See ecb_cipher.cache_info() for hits and misses.
+    """
+    # The AES backend is only imported once it's needed, since it's slow to
+    # import and most entry points never use it
+    from Crypto.Cipher import AES
+
+    return AES.new(key, AES.MODE_ECB)
+
+
+def _key_bytes(key: Union[bytes, str]) -> bytes:
+    return key.encode() if isinstance(key, str) else bytes(key)
+
+
+def decrypt_aes_ecb(key: bytes, body: bytes):
+    return ecb_cipher(_key_bytes(key)).decrypt(body)
+
+
+def decrypt_aes_ecb_records(
+    key: bytes,
+    records: Iterable[bytes]
+) -> List[bytes]:
+    """
+    Decrypt many block-aligned records under the same key with a single call
+    to the cipher
+
+    Returns the decrypted records in order
+    """
+    records = list(records)
+    decrypted = decrypt_aes_ecb(key, b''.join(records))
+
+    results = []
+    offset = 0
+    for record in records:
+        results.append(decrypted[offset:offset + len(record)])
+        offset += len(record)
+    return results
+
+
+def decrypt_aes_ecb_stream(
+    key: bytes,
+    source: Union[BinaryIO, Iterable[bytes]],
+    destination: BinaryIO,
+    chunk_size: int = 1 << 20
+) -> int:
+    """
+    Decrypt a file object, or an iterable of chunks of bytes, into
+    destination piece by piece, so that blobs of any size can be decrypted
+    without holding them in memory. Chunks don't have to line up with the
+    cipher blocks.
+
+    Returns the number of bytes written
+    """
+    cipher = ecb_cipher(_key_bytes(key))
+    if hasattr(source, 'read'):
+        chunks = iter(
+            functools.partial(source.read, chunk_size),  # type: ignore
+            b''
+        )  # type: Iterable[bytes]
+    else:
+        chunks = source  # type: ignore
+
+    # Bytes left over from the end of the last chunk that don't fill a block
+    pending = bytearray(BLOCK_SIZE)
+    pending_length = 0
+    total = 0
+    for chunk in chunks:
+        view = memoryview(chunk)
+        if pending_length:
+            # Top up the left over bytes to a whole block first
+            head = view[:BLOCK_SIZE - pending_length]
+            pending[pending_length:pending_length + len(head)] = head
+            pending_length += len(head)
+            view = view[len(head):]
+            if pending_length < BLOCK_SIZE:
+                continue
+            destination.write(cipher.decrypt(bytes(pending)))
+            total += BLOCK_SIZE
+            pending_length = 0
+
+        aligned = len(view) - len(view) % BLOCK_SIZE
+        if aligned:
+            destination.write(cipher.decrypt(view[:aligned]))
+            total += aligned
+
+        pending_length = len(view) - aligned
+        pending[:pending_length] = view[aligned:]
+
+    if pending_length:
+        raise ValueError(
+            'Ciphertext length must be a multiple of {}'.format(BLOCK_SIZE)
+        )
+    return total
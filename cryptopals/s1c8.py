@@ -0,0 +1,109 @@
+import binascii
+from collections import defaultdict
+from typing import (
+    Dict, Iterable, Iterator, List, NamedTuple, Tuple, TypeVar, cast
+)
+
+from .s1c1 import iter_mapped_hex_records
+from .s1c6 import BlockView
+
+
+class BlockRepeats(NamedTuple):
+    # Number of blocks that are identical to an earlier block
+    repeats: int
+    # Byte offsets of every occurrence of each block that appears more than
+    # once, in order of first occurrence
+    offsets: List[List[int]]
+    # Fraction of all blocks that are repeats
+    ratio: float
+
+
+def block_repeats(text: bytes, block_size: int = 16) -> BlockRepeats:
+    """
+    Break a text into blocks of block_size and find the ones that are
+    identical, in a single pass. A trailing partial block is ignored rather
+    than padded, so that it can't match anything by accident.
+    """
+    view = memoryview(text)
+    if not view.readonly:
+        # Only read-only views can be hashed
+        view = memoryview(bytes(view))
+    blocks = BlockView(view, block_size, 'truncate')
+    block_count = len(blocks)
+
+    # Read-only memoryviews hash and compare by content, so the blocks can be
+    # counted without copying them out of the text
+    occurrences = defaultdict(list)  # type: Dict[memoryview, List[int]]
+    for n, block in enumerate(blocks):
+        occurrences[block].append(n * block_size)
+
+    offsets = [found for found in occurrences.values() if len(found) > 1]
+    repeats = block_count - len(occurrences)
+    return BlockRepeats(
+        repeats,
+        offsets,
+        repeats / block_count if block_count else 0.0,
+    )
+
+
+def same_blocks(text: bytes, block_size: int = 16) -> int:
+    """
+    Break a text into block_size chunks and return the number of pairs of
+    those blocks that are identical
+    """
+    return sum(
+        len(found) * (len(found) - 1) // 2
+        for found in block_repeats(text, block_size).offsets
+    )
+
+
+# A hex encoded line or a decoded record, yielded back as the type given
+_Line = TypeVar('_Line', str, bytes)
+
+
+def scan_for_ecb(
+    lines: Iterable[_Line],
+    block_size: int = 16,
+    decoded: bool = False
+) -> Iterator[Tuple[int, _Line]]:
+    """
+    Given an iterable of hex encoded lines (such as a file opened in either
+    text or binary mode), lazily yield the line number and line of each line
+    that has repeated blocks, and is therefore likely encrypted with AES-ECB.
+    With decoded=True the iterable is of already decoded records instead,
+    such as from s1c1.iter_hex_records.
+    """
+    for n, line in enumerate(lines):
+        if decoded:
+            record = cast(bytes, line)
+        else:
+            record = binascii.unhexlify(line.strip())
+        if block_repeats(record, block_size).repeats > 0:
+            yield n, line
+
+
+def scan_file_for_ecb(
+    filename: str,
+    block_size: int = 16
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Like scan_for_ecb, but memory-maps a file of hex encoded lines on local
+    disk and decodes each line straight from the map
+
+    Yields tuples of the line's byte offset in the file, decoded line
+    """
+    for offset, record in iter_mapped_hex_records(filename):
+        if block_repeats(record, block_size).repeats > 0:
+            yield offset, record
+
+
+def set_1_challenge_8(filename: str) -> Iterator[Tuple[int, str]]:
+    """
+    This function is written specifically to the challenge. Given a file name,
+    read all the rows from that file and identify one of those rows that is
+    encrypted with a AES-ECB
+
+    Yields tuples of line number, line as they are found
+    """
+    with open(filename, 'r') as encrypted_file:
+        yield from scan_for_ecb(encrypted_file)
@@ -0,0 +1,172 @@
+"""
+AES in ECB and CBC modes, built on the cached ECB ciphers from s1c7
+
+Every mode runs on the one AES-ECB cipher per key, so a key schedule is only
+computed once however many records and modes use that key. ECB, and CBC
+decryption, don't depend on earlier blocks of output, so all of their blocks
+go through the cipher in a single call; only CBC encryption has to go block
+by block. Nothing here pads: bodies must already be a whole number of blocks.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .s1c2 import xor_bytes
+from .s1c7 import BLOCK_SIZE, _key_bytes, ecb_cipher
+
+
+MODES = ('ecb', 'cbc')
+
+# A key, an IV (ignored, and may be None, in ECB mode) and a body
+Record = Tuple[Union[bytes, str], Optional[bytes], bytes]
+
+
+def _check_aligned(body: bytes):
+    if len(body) % BLOCK_SIZE:
+        raise ValueError(
+            'Body length must be a multiple of {}'.format(BLOCK_SIZE)
+        )
+
+
+def _check_iv(iv: Optional[bytes]):
+    if iv is None or len(iv) != BLOCK_SIZE:
+        raise ValueError('IV must be {} bytes long'.format(BLOCK_SIZE))
+
+
+def _check_mode(mode: str):
+    if mode not in MODES:
+        raise ValueError(
+            'Mode must be one of {}'.format(', '.join(MODES))
+        )
+
+
+def _chain(iv: bytes, body: bytes) -> bytes:
+    """
+    The blocks each CBC ciphertext block is XORed with: the IV, then every
+    ciphertext block but the last
+    """
+    return iv + body[:-BLOCK_SIZE] if body else b''
+
+
+def _encrypt_cbc(cipher, iv: bytes, body: bytes) -> bytes:
+    encrypted = bytearray(len(body))
+    view = memoryview(encrypted)
+    block = bytearray(BLOCK_SIZE)
+    previous = memoryview(iv)
+    for offset in range(0, len(body), BLOCK_SIZE):
+        xor_bytes(body[offset:offset + BLOCK_SIZE], previous, out=block)
+        view[offset:offset + BLOCK_SIZE] = cipher.encrypt(bytes(block))
+        previous = view[offset:offset + BLOCK_SIZE]
+    return bytes(encrypted)
+
+
+def encrypt_aes_ecb(key: bytes, body: bytes) -> bytes:
+    _check_aligned(body)
+    return ecb_cipher(_key_bytes(key)).encrypt(body)
+
+
+def encrypt_aes_cbc(key: bytes, iv: bytes, body: bytes) -> bytes:
+    _check_aligned(body)
+    _check_iv(iv)
+    return _encrypt_cbc(ecb_cipher(_key_bytes(key)), iv, body)
+
+
+def decrypt_aes_cbc(key: bytes, iv: bytes, body: bytes) -> bytes:
+    """
+    Decrypt every block at once, then undo the chaining with one XOR against
+    the IV and the ciphertext shifted along a block
+    """
+    _check_aligned(body)
+    _check_iv(iv)
+    decrypted = bytearray(ecb_cipher(_key_bytes(key)).decrypt(body))
+    return bytes(xor_bytes(decrypted, _chain(iv, body), out=decrypted))
+
+
+def _group_by_key(records: Sequence[Record]) -> Dict[bytes, List[int]]:
+    """
+    Returns the indices of the records under each key, in order
+    """
+    groups = {}  # type: Dict[bytes, List[int]]
+    for index, (key, _, _) in enumerate(records):
+        groups.setdefault(_key_bytes(key), []).append(index)
+    return groups
+
+
+def _split(body: bytes, lengths: Iterable[int]) -> List[bytes]:
+    results = []
+    offset = 0
+    for length in lengths:
+        results.append(body[offset:offset + length])
+        offset += length
+    return results
+
+
+def _check_records(records: Sequence[Record], mode: str):
+    _check_mode(mode)
+    for _, iv, body in records:
+        _check_aligned(body)
+        if mode == 'cbc':
+            _check_iv(iv)
+
+
+def encrypt_records(
+    records: Iterable[Record],
+    mode: str = 'cbc'
+) -> List[bytes]:
+    """
+    Encrypt many records of (key, iv, body), which may be under different
+    keys. Records are grouped by key so that each key's cipher is set up
+    once, and in ECB mode each group is encrypted with a single call.
+
+    Returns the encrypted records in the order given
+    """
+    records = list(records)
+    _check_records(records, mode)
+
+    results = [b''] * len(records)
+    for key, indices in _group_by_key(records).items():
+        cipher = ecb_cipher(key)
+        bodies = [records[index][2] for index in indices]
+        if mode == 'ecb':
+            encrypted = _split(
+                cipher.encrypt(b''.join(bodies)), map(len, bodies)
+            )
+        else:
+            encrypted = [
+                _encrypt_cbc(cipher, records[index][1], body)  # type: ignore
+                for index, body in zip(indices, bodies)
+            ]
+        for index, record in zip(indices, encrypted):
+            results[index] = record
+    return results
+
+
+def decrypt_records(
+    records: Iterable[Record],
+    mode: str = 'cbc'
+) -> List[bytes]:
+    """
+    Decrypt many records of (key, iv, body), which may be under different
+    keys. Records are grouped by key and each group is decrypted with a
+    single call to that key's cipher, in either mode; CBC chaining is then
+    undone for the whole group with one XOR.
+
+    Returns the decrypted records in the order given
+    """
+    records = list(records)
+    _check_records(records, mode)
+
+    results = [b''] * len(records)
+    for key, indices in _group_by_key(records).items():
+        bodies = [records[index][2] for index in indices]
+        decrypted = bytearray(ecb_cipher(key).decrypt(b''.join(bodies)))
+        if mode == 'cbc':
+            chain = b''.join(
+                _chain(records[index][1], body)  # type: ignore
+                for index, body in zip(indices, bodies)
+            )
+            xor_bytes(decrypted, chain, out=decrypted)
+        for index, record in zip(
+            indices, _split(bytes(decrypted), map(len, bodies))
+        ):
+            results[index] = record
+    return results
@@ -0,0 +1,289 @@
+"""
+An asyncio front end for the blocking set 1 cryptanalysis functions
+
+CPU-bound work runs in a shared process pool so that it never holds up the
+event loop. Small requests are queued and dispatched to the pool in batches,
+so that many concurrent callers share one round trip to a worker. Queues are
+bounded: once max_pending requests of a kind are waiting, callers wait for
+room (backpressure). Cancelling a caller drops its request if it hasn't been
+dispatched yet and discards its result otherwise.
+
+    async with CryptanalysisService() as service:
+        decrypted, key, score = await service.detect_single_byte_xor(body)
+"""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from .s1c3 import find_single_character_decryption_key
+from .s1c6 import decrypt_by_repeating_key
+from .s1c8 import BlockRepeats, block_repeats
+
+
+# The result of one request in a batch, or the exception it raised, so that
+# one bad request doesn't fail the others batched with it
+_Outcome = Tuple[Any, Optional[Exception]]
+
+
+def _each(function: Callable[[Any], Any], items: List[Any]) -> List[_Outcome]:
+    outcomes = []  # type: List[_Outcome]
+    for item in items:
+        try:
+            outcomes.append((function(item), None))
+        except Exception as error:
+            outcomes.append((None, error))
+    return outcomes
+
+
+def _fail_closed(future: asyncio.Future):
+    if not future.done():
+        future.set_exception(RuntimeError('Service is closed'))
+
+
+def _detect_ecb(item: Tuple[bytes, int]) -> BlockRepeats:
+    text, block_size = item
+    return block_repeats(text, block_size)
+
+
+def _detect_single_byte_batch(items: List[bytes]) -> List[_Outcome]:
+    return _each(find_single_character_decryption_key, items)
+
+
+def _detect_ecb_batch(items: List[Tuple[bytes, int]]) -> List[_Outcome]:
+    return _each(_detect_ecb, items)
+
+
+class _Batcher:
+    """
+    Collects queued requests into batches of up to batch_size and runs each
+    batch as a single call to function in the executor, with at most
+    max_batches batches running at once. function returns a result or
+    exception for each request.
+    """
+
+    def __init__(
+        self,
+        function: Callable[[List[Any]], List[_Outcome]],
+        executor: Executor,
+        batch_size: int,
+        batch_delay: float,
+        max_pending: int,
+        max_batches: int,
+    ):
+        self.function = function
+        self.executor = executor
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue = asyncio.Queue(maxsize=max_pending)  # type: asyncio.Queue
+        self.slots = asyncio.Semaphore(max_batches)
+        self.batches = 0
+        self.closed = False
+        self._dispatches = set()  # type: Set[asyncio.Future]
+        self._task = asyncio.ensure_future(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        if self.closed:
+            raise RuntimeError('Service is closed')
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        # The batcher may have closed while this caller waited for room. Its
+        # request is failed along with anything else queued, which in turn
+        # makes room for the next caller waiting to put one.
+        if self.closed:
+            self._drain()
+        return await future
+
+    def _drain(self):
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            _fail_closed(future)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        batch = []  # type: List[Tuple[Any, asyncio.Future]]
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                # Give other callers a moment to join the batch
+                await asyncio.sleep(self.batch_delay)
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+
+                # Drop requests whose callers have given up
+                batch = [
+                    (item, future) for item, future in batch
+                    if not future.cancelled()
+                ]
+                if not batch:
+                    continue
+
+                await self.slots.acquire()
+                self.batches += 1
+                dispatch = loop.create_task(self._dispatch(batch))
+                self._dispatches.add(dispatch)
+                dispatch.add_done_callback(self._dispatches.discard)
+                batch = []
+        finally:
+            # Requests taken off the queue but not yet dispatched
+            for _, future in batch:
+                _fail_closed(future)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, self.function, [item for item, _ in batch]
+            )
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for (_, future), (result, failure) in zip(batch, results):
+                if future.done():
+                    continue
+                if failure is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(failure)
+        finally:
+            self.slots.release()
+
+    async def close(self):
+        """
+        Stop taking requests and fail the ones that haven't been dispatched
+        with RuntimeError, letting the dispatched ones finish
+        """
+        self.closed = True
+        self._task.cancel()
+        await asyncio.gather(
+            self._task, *self._dispatches, return_exceptions=True
+        )
+        # Emptying the queue lets callers waiting for room in it carry on,
+        # and they give up once they see the batcher is closed
+        self._drain()
+
+
+class CryptanalysisService:
+    """
+    Serves detect_single_byte_xor, crack_repeating_key_xor and detect_ecb
+    requests from a shared pool of worker processes (all cores by default),
+    or from the executor given
+
+    Must be started with start(), or used as an async context manager, from
+    inside a running event loop. Once closed, new requests and any that
+    haven't been dispatched yet raise RuntimeError.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        batch_size: int = 256,
+        batch_delay: float = 0.002,
+        max_pending: int = 4096,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self._owns_executor = executor is None
+        self._executor = executor
+        self._single_byte = None  # type: Optional[_Batcher]
+        self._ecb = None  # type: Optional[_Batcher]
+        self._repeating_key_slots = None  # type: Optional[asyncio.Semaphore]
+        self._closed = False
+
+    async def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        max_batches = self.workers or 4
+        self._single_byte = _Batcher(
+            _detect_single_byte_batch, self._executor,
+            self.batch_size, self.batch_delay, self.max_pending, max_batches,
+        )
+        self._ecb = _Batcher(
+            _detect_ecb_batch, self._executor,
+            self.batch_size, self.batch_delay, self.max_pending, max_batches,
+        )
+        self._repeating_key_slots = asyncio.Semaphore(max_batches)
+
+    async def close(self):
+        self._closed = True
+        for batcher in (self._single_byte, self._ecb):
+            if batcher is not None:
+                await batcher.close()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self) -> 'CryptanalysisService':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _check_started(self):
+        if self._closed:
+            raise RuntimeError('Service is closed')
+        if self._single_byte is None:
+            raise RuntimeError('Service has not been started')
+
+    @property
+    def batches(self) -> int:
+        """
+        How many batches of small requests have been dispatched so far
+        """
+        return sum(
+            batcher.batches for batcher in (self._single_byte, self._ecb)
+            if batcher is not None
+        )
+
+    async def detect_single_byte_xor(
+        self,
+        ciphertext: bytes
+    ) -> Tuple[bytes, bytes, float]:
+        """
+        s1c3.find_single_character_decryption_key, batched with other
+        concurrent requests
+        """
+        self._check_started()
+        return await self._single_byte.submit(  # type: ignore
+            bytes(ciphertext)
+        )
+
+    async def detect_ecb(
+        self,
+        ciphertext: bytes,
+        block_size: int = 16
+    ) -> BlockRepeats:
+        """
+        s1c8.block_repeats, batched with other concurrent requests
+        """
+        self._check_started()
+        if block_size < 1:
+            raise ValueError('Block size must be at least 1')
+        return await self._ecb.submit(  # type: ignore
+            (bytes(ciphertext), block_size)
+        )
+
+    async def crack_repeating_key_xor(
+        self,
+        body: bytes
+    ) -> Tuple[bytes, bytes]:
+        """
+        s1c6.decrypt_by_repeating_key, run on its own in a worker since each
+        one is already a large job
+
+        Returns a tuple of string, key
+        """
+        self._check_started()
+        loop = asyncio.get_running_loop()
+        async with self._repeating_key_slots:  # type: ignore
+            return await loop.run_in_executor(
+                self._executor, decrypt_by_repeating_key, bytes(body)
+            )
@@ -8,17 +8,27 @@ English) and the tests were written after the correct solution (e.g., the
 English string to be identified) was determined.
 """
 
+import asyncio
 import base64
+import io
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 
-import s1c1
-import s1c2
-import s1c3
-import s1c4
-import s1c5
-import s1c6
-import s1c7
-import s1c8
+from cryptopals import (
+    instrumentation,
+    service,
+    s1c1,
+    s1c2,
+    s1c3,
+    s1c4,
+    s1c5,
+    s1c6,
+    s1c7,
+    s1c8,
+)
 
 
 class CryptoPalsTestCase(unittest.TestCase):
@@ -33,6 +43,56 @@ class CryptoPalsTestCase(unittest.TestCase):
             b'SSdtIGtpbGxpbmcgeW91ciBicmFpbiBsaWtlIGEgcG9pc29ub3VzIG11c2hyb29t'
         )
 
+    def test_streaming_decoders(self):
+        "Chunked hex and base64 decoding of the challenge data"
+
+        with open('challenge-data/s1c6.txt', 'rb') as file:
+            expected = base64.decodebytes(file.read())
+
+        for chunk_size in (1, 5, 61, 1 << 20):
+            with open('challenge-data/s1c6.txt', 'rb') as file:
+                decoded = b''.join(
+                    s1c1.iter_base64_chunks(file, chunk_size=chunk_size)
+                )
+            self.assertEqual(decoded, expected)
+
+        with self.assertRaises(ValueError):
+            list(s1c1.iter_base64_chunks([b'SSdt\nIGtp', b'bGxp\nbm']))
+
+        self.assertEqual(
+            list(s1c1.iter_hex_records(['6869\n', '\n', b'7468657265\n'])),
+            [b'hi', b'there']
+        )
+        self.assertEqual(
+            list(s1c1.iter_base64_records(['aGk=\n', b'dGhlcmU=\n'])),
+            [b'hi', b'there']
+        )
+
+        with open('challenge-data/s1c4.txt', 'rb') as file:
+            report = s1c4.detect_single_character_xor(
+                s1c1.iter_hex_records(file), workers=1, decoded=True
+            )
+        # SPOILER
+        self.assertEqual(
+            report.results[0][1], b'Now that the party is jumping\n'
+        )
+
+        with open('challenge-data/s1c8.txt', 'rb') as file:
+            hits = list(
+                s1c8.scan_for_ecb(s1c1.iter_hex_records(file), decoded=True)
+            )
+        self.assertEqual([n for n, _ in hits], [132])
+
+        # Binary files are hex lines too unless decoded is given
+        with open('challenge-data/s1c4.txt', 'rb') as file:
+            report = s1c4.detect_single_character_xor(file, workers=1)
+        self.assertEqual(
+            report.results[0][1], b'Now that the party is jumping\n'
+        )
+        with open('challenge-data/s1c8.txt', 'rb') as file:
+            hits = list(s1c8.scan_for_ecb(file))
+        self.assertEqual([n for n, _ in hits], [132])
+
     def test_xor(self):
         "https://cryptopals.com/sets/1/challenges/2"
 
@@ -44,6 +104,34 @@ class CryptoPalsTestCase(unittest.TestCase):
             '746865206b696420646f6e277420706c6179'
         )
 
+    def test_xor_bytes(self):
+        "Raw, in-place and repeating versions of challenge 2"
+
+        b1 = bytes.fromhex('1c0111001f010100061a024b53535009181c')
+        b2 = bytes.fromhex('686974207468652062756c6c277320657965')
+        expected = bytes.fromhex('746865206b696420646f6e277420706c6179')
+
+        self.assertEqual(s1c2.xor_bytes(b1, memoryview(b2)), expected)
+
+        out = bytearray(b1)
+        self.assertIs(s1c2.xor_bytes(out, b2, out=out), out)
+        self.assertEqual(out, expected)
+
+        with self.assertRaises(ValueError):
+            s1c2.xor_bytes(b1, b2[1:])
+        for wrong_length in (len(b1) - 1, len(b1) + 1):
+            with self.assertRaises(ValueError):
+                s1c2.xor_bytes(b1, b2, out=bytearray(wrong_length))
+
+        self.assertEqual(
+            s1c2.xor_repeating(b'\x00' * 7, b'abc', phase=1),
+            b'bcabcab'
+        )
+        self.assertEqual(
+            s1c2.xor_repeating(b'\x00' * 4, memoryview(b'xabc')[1:]),
+            b'abca'
+        )
+
     def test_english_like(self):
         """
         The english string should score lower than the gibberish one--this
@@ -64,6 +152,41 @@ class CryptoPalsTestCase(unittest.TestCase):
             )
         )
 
+    def test_language_model_metrics(self):
+        "Every scoring metric should prefer english to gibberish"
+
+        english = (
+            b'Call me Ishmael. Some years ago- never mind how long '
+            b'precisely- having little or no money in my purse, and '
+            b'nothing particular to interest me on shore, I thought I '
+            b'would sail about a little and see the watery part of the '
+            b'world.'
+        )
+        gibberish = (
+            b'sfdhsuit47oroAS(y53hfs;dt8o4w;otnghow;t4f)dfet3tgh8lfdhfluisa'
+        )
+
+        with tempfile.NamedTemporaryFile(suffix='.txt') as corpus:
+            corpus.write(english)
+            corpus.flush()
+            corpus_model = s1c3.LanguageModel.from_corpus(corpus.name)
+
+        models = [corpus_model] + [
+            s1c3.LanguageModel.from_frequencies(
+                s1c3.ENGLISH_CHARACTER_FREQUENCY, metric
+            )
+            for metric in s1c3.METRICS
+        ]
+        for model in models:
+            self.assertLess(model.score(english), model.score(gibberish))
+
+        decrypted, key, _ = s1c3.find_single_character_decryption_key(
+            s1c3.single_character_xor(b'Hello, World! Where is Ishmael?', 7),
+            model=corpus_model
+        )
+        self.assertEqual(decrypted, b'Hello, World! Where is Ishmael?')
+        self.assertEqual(key, b'\x07')
+
     def test_single_character_decryption(self):
         "https://cryptopals.com/sets/1/challenges/3"
 
@@ -77,6 +200,73 @@ class CryptoPalsTestCase(unittest.TestCase):
         self.assertEqual(decrypted, b"Cooking MC's like a pound of bacon")
         self.assertEqual(key, b'X')
 
+    def test_single_character_decryption_batch(self):
+        "Batched version of https://cryptopals.com/sets/1/challenges/3"
+
+        plaintext = b"Cooking MC's like a pound of bacon"
+        results = s1c3.find_single_character_decryption_keys([
+            s1c3.single_character_xor(plaintext, ord('X')),
+            s1c3.single_character_xor(plaintext, 0xff),
+        ])
+
+        self.assertEqual(
+            [(decrypted, key) for decrypted, key, _ in results],
+            [(plaintext, b'X'), (plaintext, b'\xff')]
+        )
+
+    def test_single_character_candidates(self):
+        "Compact, lazily decrypted results for a batch of ciphertexts"
+
+        with open('challenge-data/s1c4.txt', 'r') as file:
+            lines = [bytes.fromhex(line.strip()) for line in file]
+
+        candidates = s1c3.find_single_character_candidates(lines)
+        self.assertEqual(len(candidates), len(lines))
+        self.assertEqual(
+            [candidates.result(i) for i in range(len(candidates))],
+            s1c3.find_single_character_decryption_keys(lines)
+        )
+
+        best = candidates.top(3)
+        self.assertEqual(len(best), 3)
+        self.assertEqual(
+            [candidates.scores[i] for i in best],
+            sorted(candidates.scores)[:3]
+        )
+        # SPOILER
+        self.assertEqual(
+            candidates.plaintext(best[0]), b'Now that the party is jumping\n'
+        )
+
+    def test_single_character_decryption_pruned(self):
+        "Pruned version of https://cryptopals.com/sets/1/challenges/3"
+
+        ciphertext = bytes.fromhex(
+            '1b37373331363f78151b7f2b783431333d78397828372d363c78373e783a3'
+            '93b3736'
+        )
+        search = s1c3.find_single_character_decryption_key_pruned(
+            ciphertext, top_k=3
+        )
+
+        self.assertEqual(len(search.results), 3)
+        self.assertGreater(search.pruned, 200)
+        self.assertEqual(
+            search.results[0],
+            s1c3.find_single_character_decryption_key(ciphertext)
+        )
+        self.assertEqual(
+            [score for _, _, score in search.results],
+            sorted(score for _, _, score in search.results)
+        )
+
+        # With nothing printable, every key is still tried
+        search = s1c3.find_single_character_decryption_key_pruned(
+            bytes(range(256)), threshold=0
+        )
+        self.assertEqual(search.pruned, 0)
+        self.assertEqual(len(search.results), 1)
+
     def test_set_1_challenge_4(self):
         "https://cryptopals.com/sets/1/challenges/4"
 
@@ -84,6 +274,28 @@ class CryptoPalsTestCase(unittest.TestCase):
         # SPOILER
         self.assertEqual(decrypted, b'Now that the party is jumping\n')
 
+    def test_detect_single_character_xor(self):
+        "Streaming and parallel versions of the challenge 4 search"
+
+        with open('challenge-data/s1c4.txt', 'r') as file:
+            lines = file.readlines()
+
+        serial = s1c4.detect_single_character_xor(
+            lines, top_k=3, workers=1, chunk_size=50
+        )
+        parallel = s1c4.detect_single_character_xor(
+            iter(lines), top_k=3, workers=2, chunk_size=50
+        )
+
+        self.assertEqual(serial.lines, len(lines))
+        self.assertEqual(serial.results, parallel.results)
+        self.assertEqual(len(serial.results), 3)
+        # SPOILER
+        self.assertEqual(
+            serial.results[0][1], b'Now that the party is jumping\n'
+        )
+        self.assertGreater(serial.lines_per_second, 0)
+
     def test_repeating_key_xor(self):
         "http://cryptopals.com/sets/1/challenges/5"
 
@@ -99,6 +311,24 @@ class CryptoPalsTestCase(unittest.TestCase):
             '65286326302e27282f'
         )
 
+    def test_repeating_key_xor_stream(self):
+        "Streaming version of http://cryptopals.com/sets/1/challenges/5"
+
+        plaintext = (
+            b'Burning \'em, if you ain\'t quick and nimble\n'
+            b'I go crazy when I hear a cymbal'
+        )
+        encrypted = io.BytesIO()
+        written = s1c5.repeating_key_xor_stream(
+            io.BytesIO(plaintext), encrypted, b'ICE', chunk_size=7
+        )
+
+        self.assertEqual(written, len(plaintext))
+        self.assertEqual(
+            encrypted.getvalue(),
+            s1c5.repeating_key_xor(plaintext, b'ICE')
+        )
+
     def test_hamming_distance(self):
         "Item 2 from http://cryptopals.com/sets/1/challenges/6"
 
@@ -110,6 +340,57 @@ class CryptoPalsTestCase(unittest.TestCase):
             37
         )
 
+    def test_hamming_distances(self):
+        "Pairwise distances for item 2 of challenge 6"
+
+        blocks = [b'this is a test', b'wokka wokka!!!', b'this is a tesT']
+        self.assertEqual(
+            s1c6.hamming_distances(blocks),
+            [
+                [0, 37, 1],
+                [37, 0, s1c6.hamming_distance(blocks[1], blocks[2])],
+                [1, s1c6.hamming_distance(blocks[1], blocks[2]), 0],
+            ]
+        )
+        with self.assertRaises(ValueError):
+            s1c6.hamming_distances([b'short', b'longer'])
+
+        with open('challenge-data/s1c6.txt', 'rb') as file:
+            input_bytes = base64.decodebytes(file.read())
+        key_sizes = s1c6.likely_keysizes(input_bytes, method='pairwise')
+        # SPOILER
+        self.assertEqual(key_sizes[0][0], 29)
+        with self.assertRaises(ValueError):
+            s1c6.likely_keysizes(input_bytes, sample=None, method='pairwise')
+
+    def test_block_view(self):
+        "Zero-copy blocks and columns with each remainder policy"
+
+        body = b'YELLOW SUBMARINE!'
+        padded = s1c6.BlockView(body, 4)
+        truncated = s1c6.BlockView(body, 4, 'truncate')
+        short = s1c6.BlockView(body, 4, 'short')
+
+        self.assertEqual(
+            [bytes(block) for block in padded],
+            [b'YELL', b'OW S', b'UBMA', b'RINE', b'!\x00\x00\x00']
+        )
+        self.assertEqual(len(truncated), 4)
+        self.assertEqual(bytes(short[-1]), b'!')
+        self.assertEqual(bytes(padded.column(0)), b'YOUR!')
+        self.assertEqual(bytes(truncated.column(0)), b'YOUR')
+        for index in (-1, 4):
+            with self.assertRaises(IndexError):
+                truncated.column(index)
+        self.assertEqual(
+            [bytes(column) for column in short.columns()],
+            [b'YOUR!', b'EWBI', b'L MN', b'LSAE']
+        )
+        self.assertEqual(
+            s1c6.bytes_to_blocks(4, body)[-1],
+            (ord('!'), 0, 0, 0)
+        )
+
     def test_likely_key_sizes(self):
         "Item 4 from http://cryptopals.com/sets/1/challenges/6"
 
@@ -140,6 +421,24 @@ class CryptoPalsTestCase(unittest.TestCase):
             ]
         )
 
+    def test_likely_key_sizes_whole_body(self):
+        "Whole-body key size estimates for challenge 6"
+
+        with open('challenge-data/s1c6.txt', 'rb') as file:
+            input_bytes = base64.decodebytes(file.read())
+
+        for method in ('hamming', 'coincidence'):
+            for max_key_size in (100, 1024):
+                key_sizes = s1c6.likely_keysizes(
+                    input_bytes,
+                    max_key_size=max_key_size,
+                    sample=None,
+                    method=method,
+                )
+                # SPOILER
+                self.assertEqual(key_sizes[0][0], 29)
+                self.assertEqual(len(key_sizes), max_key_size - 1)
+
     def test_s1c6(self):
         with open('challenge-data/s1c6.txt', 'rb') as file:
             input_bytes = base64.decodebytes(file.read())
@@ -156,6 +455,104 @@ class CryptoPalsTestCase(unittest.TestCase):
             b'Terminator X: Bring the noise'
         )
 
+    def test_rank_repeating_key_decryptions(self):
+        "Parallel, ranked version of challenge 6"
+
+        with open('challenge-data/s1c6.txt', 'rb') as file:
+            input_bytes = base64.decodebytes(file.read())
+
+        serial = s1c6.rank_repeating_key_decryptions(input_bytes, 5)
+        parallel = s1c6.rank_repeating_key_decryptions(
+            input_bytes, 5, workers=2
+        )
+
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(serial), 5)
+        self.assertEqual(
+            [score for _, _, score in serial],
+            sorted(score for _, _, score in serial)
+        )
+        # SPOILER
+        self.assertEqual(serial[0][1], b'Terminator X: Bring the noise')
+
+    def test_solution_cache(self):
+        "Cached column solutions for challenge 6"
+
+        with open('challenge-data/s1c6.txt', 'rb') as file:
+            input_bytes = base64.decodebytes(file.read())
+        expected = s1c6.decrypt_by_repeating_key(input_bytes)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'solutions')
+
+            with s1c3.SolutionCache(path=path) as cache:
+                self.assertEqual(
+                    s1c6.decrypt_by_repeating_key(input_bytes, cache=cache),
+                    expected
+                )
+                first_misses = cache.misses
+                self.assertEqual(cache.hits, 0)
+
+                self.assertEqual(
+                    s1c6.decrypt_by_repeating_key(input_bytes, cache=cache),
+                    expected
+                )
+                self.assertEqual(cache.misses, first_misses)
+                self.assertEqual(cache.hits, first_misses)
+
+            # A new cache with a tiny memory budget still finds every
+            # solution on disk
+            with s1c3.SolutionCache(max_bytes=1000, path=path) as cache:
+                self.assertEqual(
+                    s1c6.decrypt_by_repeating_key(input_bytes, cache=cache),
+                    expected
+                )
+                self.assertEqual(cache.misses, 0)
+                self.assertLessEqual(cache.stats()['bytes'], 1000)
+
+    def test_instrumentation(self):
+        "Stage counters for the challenge 6 pipeline"
+
+        with open('challenge-data/s1c6.txt', 'rb') as file:
+            input_bytes = base64.decodebytes(file.read())
+
+        with tempfile.TemporaryDirectory() as directory:
+            profile = os.path.join(directory, 'decrypt.prof')
+            with instrumentation.collect(profile_to=profile) as counters:
+                s1c6.decrypt_by_repeating_key(input_bytes)
+            self.assertTrue(os.path.getsize(profile))
+
+        self.assertFalse(instrumentation.ENABLED)
+        self.assertEqual(counters['likely_keysizes']['calls'], 1)
+        self.assertEqual(counters['like_english_score']['calls'], 5)
+        self.assertEqual(
+            counters['find_single_character_decryption_key']['calls'],
+            sum(size for size, _ in s1c6.likely_keysizes(input_bytes)[:5])
+        )
+        self.assertGreaterEqual(
+            counters['solve_columns']['bytes'], len(input_bytes) * 5
+        )
+
+        # Nothing is counted once collection has finished
+        s1c3.like_english_score(b'hello')
+        self.assertEqual(
+            instrumentation.counters()['like_english_score']['calls'], 5
+        )
+
+        # Later and nested collections leave earlier counters alone
+        with instrumentation.collect() as outer:
+            s1c3.like_english_score(b'hello')
+            with instrumentation.collect() as inner:
+                s1c3.like_english_score(b'hello')
+                s1c6.likely_keysizes(input_bytes)
+            s1c3.like_english_score(b'hello')
+        self.assertEqual(counters['like_english_score']['calls'], 5)
+        self.assertEqual(inner['like_english_score']['calls'], 1)
+        self.assertEqual(outer['like_english_score']['calls'], 3)
+        self.assertEqual(outer['likely_keysizes']['calls'], 1)
+        instrumentation.reset()
+        self.assertEqual(inner['like_english_score']['calls'], 1)
+
     def test_s1c7(self):
         with open('challenge-data/s1c7.txt', 'rb') as file:
             input_bytes = base64.decodebytes(file.read())
@@ -169,7 +566,7 @@ class CryptoPalsTestCase(unittest.TestCase):
         )
 
     def test_s1c8(self):
-        result = s1c8.set_1_challenge_8('challenge-data/s1c8.txt')
+        result = list(s1c8.set_1_challenge_8('challenge-data/s1c8.txt'))
 
         # SPOILER
         self.assertCountEqual(
@@ -177,6 +574,240 @@ class CryptoPalsTestCase(unittest.TestCase):
             (132, 'd880619740a8a19b7840a8a31c810a3d08649af70dc06f4fd5d2d69c744cd283e2dd052f6b641dbf9d11b0348542bb5708649af70dc06f4fd5d2d69c744cd2839475c9dfdbc1d46597949d9c7e82bf5a08649af70dc06f4fd5d2d69c744cd28397a93eab8d6aecd566489154789a6b0308649af70dc06f4fd5d2d69c744cd283d403180c98c8f6db1f2a3f9c4040deb0ab51b29933f2c123c58386b06fba186a\n')
         )
 
+    def test_block_repeats(self):
+        "Linear-time duplicate block counting behind challenge 8"
+
+        text = b'YELLOW SUBMARINE' * 3 + b'ORANGE SUBMARINE' + b'YELLOW'
+        repeats = s1c8.block_repeats(text)
+
+        self.assertEqual(repeats.repeats, 2)
+        self.assertEqual(repeats.offsets, [[0, 16, 32]])
+        self.assertEqual(repeats.ratio, 0.5)
+        self.assertEqual(s1c8.same_blocks(text), 3)
+        self.assertEqual(s1c8.same_blocks(bytearray(text), 8), 9)
+        # The zero-filled tail used to match a block of zeros
+        self.assertEqual(s1c8.same_blocks(bytes(16) + b'\x00'), 0)
+
+    def test_decrypt_aes_ecb_stream(self):
+        "Streaming and batched versions of challenge 7"
+
+        with open('challenge-data/s1c7.txt', 'rb') as file:
+            input_bytes = base64.decodebytes(file.read())
+        expected = s1c7.decrypt_aes_ecb(b'YELLOW SUBMARINE', input_bytes)
+
+        for chunk_size in (7, 16, 1000):
+            decrypted = io.BytesIO()
+            written = s1c7.decrypt_aes_ecb_stream(
+                b'YELLOW SUBMARINE',
+                io.BytesIO(input_bytes),
+                decrypted,
+                chunk_size=chunk_size
+            )
+            self.assertEqual(written, len(input_bytes))
+            self.assertEqual(decrypted.getvalue(), expected)
+
+        records = [input_bytes[:48], input_bytes[48:64], input_bytes[64:]]
+        self.assertEqual(
+            b''.join(
+                s1c7.decrypt_aes_ecb_records(b'YELLOW SUBMARINE', records)
+            ),
+            expected
+        )
+
+        with self.assertRaises(ValueError):
+            s1c7.decrypt_aes_ecb_stream(
+                b'YELLOW SUBMARINE', [input_bytes[:20]], io.BytesIO()
+            )
+
+    def test_memory_mapped_scanning(self):
+        "Memory-mapped, sharded versions of the challenge 4 and 8 scans"
+
+        filename = 'challenge-data/s1c4.txt'
+        with open(filename, 'rb') as file:
+            expected = list(s1c1.iter_hex_records(file))
+
+        ranges = s1c1.shard_ranges(filename, 7)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(
+            [start for start, _ in ranges[1:]],
+            [end for _, end in ranges[:-1]]
+        )
+        self.assertEqual(
+            [
+                record
+                for start, end in ranges
+                for _, record in s1c1.iter_mapped_hex_records(
+                    filename, start, end
+                )
+            ],
+            expected
+        )
+
+        serial = s1c4.detect_single_character_xor_in_file(
+            filename, top_k=3, workers=1, shards=5
+        )
+        parallel = s1c4.detect_single_character_xor_in_file(
+            filename, top_k=3, workers=2
+        )
+        self.assertEqual(serial.lines, len(expected))
+        self.assertEqual(serial.results, parallel.results)
+        # SPOILER
+        self.assertEqual(
+            serial.results[0][1], b'Now that the party is jumping\n'
+        )
+
+        hits = list(s1c8.scan_file_for_ecb('challenge-data/s1c8.txt'))
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0][0], 132 * 321)
+
+        # Surrounding whitespace is skipped just as iter_hex_records skips it
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'lines.txt')
+            with open(filename, 'wb') as file:
+                file.write(b'  7468\n\t \n6869 \r\n')
+            self.assertEqual(
+                list(s1c1.iter_mapped_hex_records(filename)),
+                [(0, b'th'), (10, b'hi')]
+            )
+
+    def test_service(self):
+        "The asyncio front end batches and cancels requests"
+
+        with open('challenge-data/s1c4.txt', 'r') as file:
+            lines = [bytes.fromhex(line.strip()) for line in file]
+        with open('challenge-data/s1c6.txt', 'rb') as file:
+            repeating_key_body = base64.decodebytes(file.read())
+        with open('challenge-data/s1c8.txt', 'r') as file:
+            ecb_line = bytes.fromhex(file.readlines()[132])
+
+        errors = []
+
+        async def run():
+            asyncio.get_running_loop().set_exception_handler(
+                lambda loop, context: errors.append(context)
+            )
+            async with service.CryptanalysisService(workers=2) as server:
+                # Cancelled while still queued, so never dispatched
+                queued = asyncio.ensure_future(
+                    server.detect_single_byte_xor(lines[0])
+                )
+                await asyncio.sleep(0)
+                queued.cancel()
+                await asyncio.sleep(0.05)
+                dropped_batches = server.batches
+
+                # Cancelled once dispatched, so its result is discarded
+                dispatched = asyncio.ensure_future(
+                    server.detect_single_byte_xor(lines[0])
+                )
+                while not server.batches:
+                    await asyncio.sleep(0.001)
+                dispatched.cancel()
+
+                detected = await asyncio.gather(*(
+                    server.detect_single_byte_xor(line) for line in lines
+                ))
+                _, key = await server.crack_repeating_key_xor(
+                    repeating_key_body
+                )
+                repeats = await server.detect_ecb(ecb_line)
+                with self.assertRaises(ValueError):
+                    await server.detect_ecb(ecb_line, block_size=0)
+                return (
+                    queued, dropped_batches, dispatched, detected, key,
+                    repeats, server.batches,
+                )
+
+        (
+            queued, dropped_batches, dispatched, detected, key, repeats,
+            batches,
+        ) = asyncio.run(run())
+
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(dropped_batches, 0)
+        self.assertTrue(dispatched.cancelled())
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            detected,
+            s1c3.find_single_character_decryption_keys(lines)
+        )
+        # Many concurrent requests share a few batches
+        self.assertLess(batches, len(lines) // 10)
+        # SPOILER
+        self.assertEqual(key, b'Terminator X: Bring the noise')
+        self.assertEqual(repeats.repeats, 3)
+
+        # A bad request in a batch fails on its own
+        (good, _), (_, error) = service._detect_ecb_batch(
+            [(ecb_line, 16), (ecb_line, 0)]
+        )
+        self.assertEqual(good, repeats)
+        self.assertIsInstance(error, ValueError)
+
+    def test_service_close(self):
+        "Closing the service fails requests waiting for room in the queue"
+
+        with open('challenge-data/s1c4.txt', 'r') as file:
+            lines = [bytes.fromhex(line.strip()) for line in file][:6]
+
+        errors = []
+
+        async def run():
+            asyncio.get_running_loop().set_exception_handler(
+                lambda loop, context: errors.append(context)
+            )
+            server = service.CryptanalysisService(
+                workers=1, batch_size=1, max_pending=1
+            )
+            await server.start()
+            tasks = [
+                asyncio.ensure_future(server.detect_single_byte_xor(line))
+                for line in lines
+            ]
+            await asyncio.sleep(0)
+            await server.close()
+            _, pending = await asyncio.wait(tasks, timeout=2)
+            with self.assertRaises(RuntimeError):
+                await server.detect_single_byte_xor(lines[0])
+            return tasks, pending
+
+        tasks, pending = asyncio.run(run())
+
+        self.assertEqual(pending, set())
+        failed = [
+            task for task in tasks
+            if isinstance(task.exception(), RuntimeError)
+        ]
+        # Only the request already dispatched when the service was closed
+        # can have finished
+        self.assertGreaterEqual(len(failed), len(tasks) - 1)
+        self.assertEqual(errors, [])
+
+    def test_import_time(self):
+        "Importing the tools shouldn't import their heavy dependencies"
+
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys, time\n'
+            'start = time.perf_counter()\n'
+            'from cryptopals import (\n'
+            '    cli, s1c1, s1c2, s1c3, s1c4, s1c5, s1c6, s1c7, s1c8\n'
+            ')\n'
+            'print(time.perf_counter() - start)\n'
+            'heavy = {"Crypto", "multiprocessing", "dbm"}\n'
+            'print(sorted(\n'
+            '    name for name in sys.modules if name.split(".")[0] in heavy\n'
+            '))\n'
+        ], universal_newlines=True)
+        seconds, heavy_modules = output.splitlines()
+
+        self.assertEqual(heavy_modules, '[]')
+        self.assertLess(float(seconds), 0.5)
+
+        # The top level modules are aliases of the package's
+        import s1c3 as alias
+        self.assertIs(alias, s1c3)
+
 
 if __name__ == '__main__':
     unittest.main()
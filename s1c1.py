@@ -1,5 +1,9 @@
-import base64
+"""
+Alias of cryptopals.s1c1, so that 'import s1c1' keeps working from a checkout
+"""
 
+import sys
 
-def hex_to_64(value: str) -> bytes:
-    return base64.b64encode(bytes.fromhex(value))
+from cryptopals import s1c1
+
+sys.modules[__name__] = s1c1
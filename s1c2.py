@@ -1,9 +1,9 @@
-import base64
+"""
+Alias of cryptopals.s1c2, so that 'import s1c2' keeps working from a checkout
+"""
 
+import sys
 
-def xor(b1: bytes, b2: bytes) -> bytes:
-    xored = bytes(
-        x ^ y for x, y in
-        zip(base64.decodebytes(b1), base64.decodebytes(b2))
-    )
-    return xored
+from cryptopals import s1c2
+
+sys.modules[__name__] = s1c2
@@ -1,5 +1,9 @@
-def repeating_key_xor(value: bytes, key: bytes) -> bytes:
-    acc = b''
-    for i, v in enumerate(value):
-        acc = acc + bytes([v ^ key[i % len(key)]])
-    return acc
+"""
+Alias of cryptopals.s1c5, so that 'import s1c5' keeps working from a checkout
+"""
+
+import sys
+
+from cryptopals import s1c5
+
+sys.modules[__name__] = s1c5
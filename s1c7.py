@@ -1,6 +1,9 @@
-from Crypto.Cipher import AES
+"""
+Alias of cryptopals.s1c7, so that 'import s1c7' keeps working from a checkout
+"""
 
+import sys
 
-def decrypt_aes_ecb(key: bytes, body: bytes):
-    decryption_suite = AES.new(key, AES.MODE_ECB)
-    return decryption_suite.decrypt(body)
+from cryptopals import s1c7
+
+sys.modules[__name__] = s1c7
@@ -10,7 +10,7 @@ English string to be identified) was determined.
 
 import unittest
 
-import s2c9
+from cryptopals import s2c9, s2c10
 
 
 class CryptoPalsTestCase(unittest.TestCase):
@@ -20,6 +20,54 @@ class CryptoPalsTestCase(unittest.TestCase):
             b'YELLOW SUBMARINE\x04\x04\x04\x04'
         )
 
+    def test_aes_cbc(self):
+        # CBC-AES128 example vector from NIST SP 800-38A, F.2.1
+        key = bytes.fromhex('2b7e151628aed2a6abf7158809cf4f3c')
+        iv = bytes.fromhex('000102030405060708090a0b0c0d0e0f')
+        plaintext = bytes.fromhex(
+            '6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51'
+            '30c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710'
+        )
+        ciphertext = bytes.fromhex(
+            '7649abac8119b246cee98e9b12e9197d5086cb9b507219ee95db113a917678b2'
+            '73bed6b8e3c1743b7116e69e222295163ff1caa1681fac09120eca307586e1a7'
+        )
+        self.assertEqual(s2c10.encrypt_aes_cbc(key, iv, plaintext), ciphertext)
+        self.assertEqual(s2c10.decrypt_aes_cbc(key, iv, ciphertext), plaintext)
+        with self.assertRaises(ValueError):
+            s2c10.encrypt_aes_cbc(key, iv, plaintext[:-1])
+
+    def test_aes_records(self):
+        records = [
+            (b'YELLOW SUBMARINE', bytes(16), b'A' * 48),
+            (b'ORANGE SUBMARINE', b'\x01' * 16, b'B' * 16),
+            (b'YELLOW SUBMARINE', b'\x02' * 16, b''),
+            (b'YELLOW SUBMARINE', b'\x03' * 16, b'C' * 32),
+        ]
+        for mode in s2c10.MODES:
+            encrypted = s2c10.encrypt_records(records, mode)
+            if mode == 'cbc':
+                expected = [
+                    s2c10.encrypt_aes_cbc(key, iv, body)
+                    for key, iv, body in records
+                ]
+            else:
+                expected = [
+                    s2c10.encrypt_aes_ecb(key, body)
+                    for key, _, body in records
+                ]
+            self.assertEqual(encrypted, expected)
+            self.assertEqual(
+                s2c10.decrypt_records(
+                    [
+                        (key, iv, body) for (key, iv, _), body
+                        in zip(records, encrypted)
+                    ],
+                    mode
+                ),
+                [body for _, _, body in records]
+            )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,9 @@
+"""
+Alias of cryptopals.s2c10, so that 'import s2c10' keeps working from a checkout
+"""
+
+import sys
+
+from cryptopals import s2c10
+
+sys.modules[__name__] = s2c10
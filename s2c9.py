@@ -1,10 +1,9 @@
-def pkcs_pad(target_length: int, text: bytes) -> bytes:
-    if target_length < len(text):
-        raise ValueError(
-            'Provided text is longer than target length {}'.format(target_length)
-        )
+"""
+Alias of cryptopals.s2c9, so that 'import s2c9' keeps working from a checkout
+"""
 
-    while len(text) < target_length:
-        text += b'\x04'
+import sys
 
-    return text
+from cryptopals import s2c9
+
+sys.modules[__name__] = s2c9
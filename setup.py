@@ -0,0 +1,17 @@
+from setuptools import setup
+
+
+setup(
+    name='cryptopals',
+    version='0.1.0',
+    description='Solutions to the Cryptopals crypto challenges',
+    python_requires='>=3.7',
+    packages=['cryptopals'],
+    # The AES backend is only imported by the AES functions, so it's optional
+    extras_require={
+        'aes': ['pycrypto'],
+    },
+    entry_points={
+        'console_scripts': ['cryptopals=cryptopals.cli:main'],
+    },
+)